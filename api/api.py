@@ -1,5 +1,6 @@
 # api/api.py
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,8 +11,25 @@ from .config import PROJECTS_DIR
 from .routes.projects import router as projects_router
 from api.routes import elevenlabs
 from api.routes import video  # ✅ Import the video router
+from api.routes import jobs
+from api.routes import cache
+from api.routes import events
+from api.routes import media
+from api.services.media_exec import shutdown_pool
+from api.services.http_clients import close_clients, pool_metrics
+from api.services.resilience import provider_status
+from api.services.jobs import recover_jobs
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    recover_jobs()
+    yield
+    await close_clients()
+    shutdown_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Ensure the data root exists before mounting static
 data_root = Path(PROJECTS_DIR)
@@ -23,11 +41,19 @@ app.mount("/static", StaticFiles(directory=str(data_root)), name="static")
 app.include_router(projects_router, prefix="/projects", tags=["projects"])
 app.include_router(elevenlabs.router, prefix="/elevenlabs")
 app.include_router(video.router)  # ✅ Include the video router
+app.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+app.include_router(cache.router, prefix="/cache", tags=["cache"])
+app.include_router(events.router, prefix="/events", tags=["events"])
+app.include_router(media.router, prefix="/media", tags=["media"])
 
 @app.get("/")
 def root():
     return {"message": "Hello from FastAPI!"}
 
+@app.get("/metrics/http")
+def http_metrics():
+    return {**pool_metrics(), "providers": provider_status()}
+
 # Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -1,2 +1,102 @@
 # api/config.py
-PROJECTS_DIR = "projects"  # single place to change if needed later
\ No newline at end of file
+import os
+
+PROJECTS_DIR = "projects"  # single place to change if needed later
+
+# Per-stage concurrency limits for the scene pipeline (per process)
+SCENE_SEARCH_CONCURRENCY = int(os.getenv("SCENE_SEARCH_CONCURRENCY", "4"))
+SCENE_RERANK_CONCURRENCY = int(os.getenv("SCENE_RERANK_CONCURRENCY", "3"))
+SCENE_DOWNLOAD_CONCURRENCY = int(os.getenv("SCENE_DOWNLOAD_CONCURRENCY", "4"))
+SCENE_PLAN_CONCURRENCY = int(os.getenv("SCENE_PLAN_CONCURRENCY", "3"))
+
+# Block scheduler limits for /generate_full_video
+BLOCK_CONCURRENCY = int(os.getenv("BLOCK_CONCURRENCY", "3"))
+
+# Project catalog: seconds between stat-only rescans for changes made outside the app
+CATALOG_RESCAN_SEC = float(os.getenv("CATALOG_RESCAN_SEC", "10"))
+
+# Change feed (/events): recent events kept for Last-Event-ID replay
+EVENTS_BUFFER = int(os.getenv("EVENTS_BUFFER", "500"))
+
+# Project metadata writes queued within this window are committed together
+METADATA_BATCH_SEC = float(os.getenv("METADATA_BATCH_SEC", "0.05"))
+
+# Output packaging for final videos (faststart is always applied):
+# optional low-bitrate preview MP4 and HLS with fMP4 segments
+PREVIEW_RENDITION = os.getenv("PREVIEW_RENDITION", "0") in ("1", "true", "True")
+PREVIEW_HEIGHT = int(os.getenv("PREVIEW_HEIGHT", "640"))
+PREVIEW_VIDEO_BITRATE = os.getenv("PREVIEW_VIDEO_BITRATE", "600k")
+HLS_PACKAGING = os.getenv("HLS_PACKAGING", "0") in ("1", "true", "True")
+HLS_SEGMENT_SEC = int(os.getenv("HLS_SEGMENT_SEC", "4"))  # multiple of the 2 s canonical GOP
+
+# Concurrent ElevenLabs syntheses for batch TTS (/elevenlabs/generate_project_audio)
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+
+# Media execution layer: max concurrent ffmpeg processes / process-pool workers
+MEDIA_WORKERS = int(os.getenv("MEDIA_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# ffprobe calls and stream-copy remuxes: I/O-bound, so they don't queue behind encodes
+MEDIA_IO_CONCURRENCY = int(os.getenv("MEDIA_IO_CONCURRENCY", "16"))
+
+# Shared on-disk cache of downloaded Pexels clips (LRU, bounded by size)
+CLIP_CACHE_DIR = os.path.join(PROJECTS_DIR, ".cache", "clips")
+CLIP_CACHE_MAX_BYTES = int(os.getenv("CLIP_CACHE_MAX_BYTES", str(5 * 1024 ** 3)))
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(256 * 1024)))
+DOWNLOAD_MAX_ATTEMPTS = int(os.getenv("DOWNLOAD_MAX_ATTEMPTS", "3"))
+
+# Pexels rendition selection: smallest file at or above this size/fps
+PEXELS_TARGET_WIDTH = int(os.getenv("PEXELS_TARGET_WIDTH", "1080"))
+PEXELS_TARGET_HEIGHT = int(os.getenv("PEXELS_TARGET_HEIGHT", "1920"))
+PEXELS_TARGET_FPS = float(os.getenv("PEXELS_TARGET_FPS", "30"))
+
+# Pexels search-result cache: fresh for SEARCH_CACHE_TTL, then served stale
+# (and refreshed in the background) for up to SEARCH_CACHE_STALE_TTL more
+SEARCH_CACHE_DIR = os.path.join(PROJECTS_DIR, ".cache", "search")
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", str(24 * 3600)))
+SEARCH_CACHE_STALE_TTL = int(os.getenv("SEARCH_CACHE_STALE_TTL", str(7 * 24 * 3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "10000"))
+
+# Shared outbound HTTP clients (one keep-alive pool per service)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+
+# Resilience governor: per-provider token buckets (requests/minute, burst),
+# retries with jittered exponential backoff, and circuit breakers
+PEXELS_RATE_PER_MIN = float(os.getenv("PEXELS_RATE_PER_MIN", "60"))
+PEXELS_BURST = int(os.getenv("PEXELS_BURST", "10"))
+ELEVENLABS_RATE_PER_MIN = float(os.getenv("ELEVENLABS_RATE_PER_MIN", "120"))
+ELEVENLABS_BURST = int(os.getenv("ELEVENLABS_BURST", "5"))
+OPENAI_RATE_PER_MIN = float(os.getenv("OPENAI_RATE_PER_MIN", "300"))
+OPENAI_BURST = int(os.getenv("OPENAI_BURST", "20"))
+
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "4"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "0.5"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "20"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_SEC = float(os.getenv("BREAKER_RESET_SEC", "30"))
+
+# Persistent cache for GPT-4o scene plans and rerank decisions
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") not in ("0", "false", "False")
+LLM_CACHE_DIR = os.path.join(PROJECTS_DIR, ".cache", "llm")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+# Local CPU pre-rank before the GPT-4o vision rerank
+PRERANK_ENABLED = os.getenv("PRERANK_ENABLED", "1") not in ("0", "false", "False")
+PRERANK_TOP_K = int(os.getenv("PRERANK_TOP_K", "4"))
+PRERANK_MARGIN = float(os.getenv("PRERANK_MARGIN", "0.25"))  # skip vision when top-1 leads by this much
+PRERANK_LOG_PATH = os.getenv("PRERANK_LOG_PATH", "")  # optional JSONL of decisions for prerank_eval
+
+# Canonical block encode profile; blocks matching it can be joined with
+# the concat demuxer and `-c copy` instead of a full re-encode
+CANONICAL_WIDTH = 1080
+CANONICAL_HEIGHT = 1920
+CANONICAL_FPS = 30
+CANONICAL_GOP = 60  # 2 s keyframe interval
+CANONICAL_PIX_FMT = "yuv420p"
+CANONICAL_CODEC = "h264"
+
+# Block rendering: "ffmpeg" builds one filter graph per block; "moviepy" is the
+# legacy compose path (also used automatically if the filter graph fails)
+BLOCK_RENDERER = os.getenv("BLOCK_RENDERER", "ffmpeg")
+BLOCK_SCENE_PAD_SEC = float(os.getenv("BLOCK_SCENE_PAD_SEC", "0.3"))  # freeze-frame tail per scene
@@ -0,0 +1,17 @@
+# api/routes/cache.py
+from fastapi import APIRouter
+
+from api.services.clip_cache import cache_stats as clip_cache_stats
+from api.services.search_cache import cache_stats as search_cache_stats
+from api.services.llm_cache import cache_stats as llm_cache_stats
+
+router = APIRouter()
+
+
+@router.get("/stats")
+def get_cache_stats():
+    return {
+        "clips": clip_cache_stats(),
+        "search": search_cache_stats(),
+        "llm": llm_cache_stats(),
+    }
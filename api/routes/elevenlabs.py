@@ -1,11 +1,17 @@
 # api/routes/elevenlabs.py
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-import httpx
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import List, Optional
 import os
 from pathlib import Path
 from api.services.audio import generate_audio_service
 from api.services.audio import generate_full_audio_service
+from api.services.audio import generate_project_audio_service
+from api.services.audio import cached_block_audio, open_block_audio_stream
+from api.services.jobs import submit_job
+from api.services.http_clients import get_client
+from api.services.resilience import call, http_status_for
 
 router = APIRouter()
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
@@ -17,12 +23,16 @@ async def list_voices():
     headers = {
         "xi-api-key": ELEVENLABS_API_KEY,
     }
-    async with httpx.AsyncClient() as client:
-        res = await client.get(f"{ELEVENLABS_BASE}/voices", headers=headers)
-        if res.status_code != 200:
-            raise HTTPException(status_code=500, detail="Failed to fetch voices")
+    async def _fetch():
+        res = await get_client("elevenlabs").get(f"{ELEVENLABS_BASE}/voices", headers=headers)
+        res.raise_for_status()
         return res.json()
 
+    try:
+        return await call("elevenlabs", _fetch)
+    except Exception as e:
+        raise HTTPException(status_code=http_status_for(e), detail=f"Failed to fetch voices: {e}")
+
 
 # 👇 NEW: Generate Audio Request schema
 class GenerateAudioRequest(BaseModel):
@@ -30,20 +40,71 @@ class GenerateAudioRequest(BaseModel):
     block_id: str
     text: str
     voice_id: str
+    force: bool = False  # re-synthesize even if text and voice are unchanged
 
 
 
 @router.post("/generate_audio")
 async def generate_audio(req: GenerateAudioRequest):
-    return generate_audio_service(
-        req.project_name, req.block_id, req.text, req.voice_id
+    return await generate_audio_service(
+        req.project_name, req.block_id, req.text, req.voice_id, force=req.force
     )
 
 
+@router.get("/stream_audio/{project_name}/{block_id}")
+async def stream_audio(project_name: str, block_id: str, voice_id: Optional[str] = None):
+    """
+    Progressive playback of a block's narration. An up-to-date mp3 is served from
+    disk (with Range support); otherwise ElevenLabs audio is forwarded as it
+    arrives and saved to the block's mp3 at the same time.
+    """
+    cached = await cached_block_audio(project_name, block_id, voice_id)
+    if cached:
+        return FileResponse(cached, media_type="audio/mpeg")
+
+    chunks = await open_block_audio_stream(project_name, block_id, voice_id)
+    return StreamingResponse(chunks, media_type="audio/mpeg", headers={"Cache-Control": "no-store"})
+
+
+class GenerateProjectAudioRequest(BaseModel):
+    project_name: str
+    voice_id: Optional[str] = None  # default: each block's last voice
+    block_ids: Optional[List[str]] = None  # default: every block
+    background: bool = False
+    force: bool = False
+
+
+@router.post("/generate_project_audio")
+async def generate_project_audio(req: GenerateProjectAudioRequest):
+    def _run():
+        return generate_project_audio_service(
+            req.project_name, voice_id=req.voice_id, block_ids=req.block_ids, force=req.force
+        )
+
+    if req.background:
+        job = submit_job(req.project_name, "generate_project_audio", {"block_ids": req.block_ids}, _run)
+        return JSONResponse(status_code=202, content=job)
+    return await _run()
+
+
 class GenerateFullAudioRequest(BaseModel):
     project_name: str
+    background: bool = False  # return a job id instead of waiting for the merge
+    force: bool = False
+    gap_ms: int = Field(0, ge=0)  # silence between blocks
+    crossfade_ms: int = Field(0, ge=0)  # overlap between blocks (takes precedence over gap_ms)
 
 
 @router.post("/generate_full_audio")
 async def generate_full_audio(req: GenerateFullAudioRequest):
-    return generate_full_audio_service(req.project_name)
\ No newline at end of file
+    if req.background:
+        job = submit_job(
+            req.project_name, "generate_full_audio", {},
+            lambda: generate_full_audio_service(
+                req.project_name, force=req.force, gap_ms=req.gap_ms, crossfade_ms=req.crossfade_ms
+            )
+        )
+        return JSONResponse(status_code=202, content=job)
+    return await generate_full_audio_service(
+        req.project_name, force=req.force, gap_ms=req.gap_ms, crossfade_ms=req.crossfade_ms
+    )
\ No newline at end of file
@@ -0,0 +1,47 @@
+# api/routes/events.py
+import json
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Header
+from fastapi.responses import StreamingResponse
+
+from api.services.events import subscribe, sse_id, parse_last_event_id
+
+router = APIRouter()
+
+HEARTBEAT_SEC = 15
+
+
+@router.get("")
+async def stream_events(project: Optional[str] = None, last_event_id: Optional[str] = Header(None)):
+    """
+    Server-Sent Events feed of project/block changes. Pass `project` to only
+    receive one project's events; browsers resume via Last-Event-ID.
+    """
+    start = parse_last_event_id(last_event_id)
+
+    async def _feed():
+        events = subscribe(project, start)
+        next_event = asyncio.ensure_future(events.__anext__())
+        try:
+            while True:
+                done, _ = await asyncio.wait({next_event}, timeout=HEARTBEAT_SEC)
+                if not done:
+                    yield ": keep-alive\n\n"
+                    continue
+                event = next_event.result()
+                yield f"id: {sse_id(event)}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                next_event = asyncio.ensure_future(events.__anext__())
+        finally:
+            next_event.cancel()
+            try:
+                await next_event
+            except (asyncio.CancelledError, StopAsyncIteration):
+                pass
+            await events.aclose()
+
+    return StreamingResponse(
+        _feed(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
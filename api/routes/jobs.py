@@ -0,0 +1,21 @@
+# api/routes/jobs.py
+from fastapi import APIRouter
+
+from api.services.jobs import get_job, list_jobs, cancel_job
+
+router = APIRouter()
+
+
+@router.get("/{job_id}")
+def get_job_status(job_id: str):
+    return get_job(job_id)
+
+
+@router.post("/{job_id}/cancel")
+def cancel_job_route(job_id: str):
+    return cancel_job(job_id)
+
+
+@router.get("/project/{project_name}")
+def list_project_jobs(project_name: str):
+    return {"jobs": list_jobs(project_name)}
@@ -0,0 +1,43 @@
+# api/routes/media.py
+import mimetypes
+from typing import Optional
+from fastapi import APIRouter, Header
+from fastapi.responses import FileResponse, Response
+
+from api.services.media_serving import resolve_media_path, content_version
+
+router = APIRouter()
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+@router.get("/{project_name}/{file_path:path}")
+async def get_media(
+    project_name: str,
+    file_path: str,
+    v: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Serves rendered media with a strong content-hash ETag and byte ranges.
+    Requests whose `v` matches the current content hash are cacheable forever;
+    others must revalidate (cheap 304 when unchanged).
+    The body goes out through FileResponse's chunked async file reads; under
+    uvicorn that is not a zero-copy sendfile.
+    """
+    path = resolve_media_path(project_name, file_path)
+    version = await content_version(path)
+    etag = f'"{version}"'
+    cache_control = IMMUTABLE if v and v == version else REVALIDATE
+
+    if if_none_match:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+    return FileResponse(
+        path,
+        media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
@@ -1,4 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Header, Response
+from typing import Literal, Optional
+import time
 from api.schemas.projects import (
     CreateProjectRequest,
     CreateProjectResponse,
@@ -10,17 +12,37 @@ from api.services.projects import (
     list_projects_service,
     get_project_detail_service
 )
+from api.utils.disk_cache import hash_key
 
 router = APIRouter()
 
+_BOOT = time.time()  # catalog versions restart with the process
+
 @router.post("/create", response_model=CreateProjectResponse)
 def create_project_clean(req: CreateProjectRequest):
     slug, files, blocks = create_project_service(req)
     return CreateProjectResponse(project=slug, files=files, blocks=blocks)
 
 @router.get("", response_model=ListProjectsResponse)
-def list_projects():
-    return list_projects_service()
+def list_projects(
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    sort: Literal["updated_at", "name", "title", "blocks"] = "updated_at",
+    order: Literal["asc", "desc"] = "desc",
+    q: Optional[str] = None,
+    has_final: Optional[bool] = None,
+    if_none_match: Optional[str] = Header(None),
+):
+    result = list_projects_service(
+        offset=offset, limit=limit, sort=sort, order=order, q=q, has_final=has_final
+    )
+    # Same catalog version + same query => same page; pollers get a cheap 304
+    etag = '"' + hash_key(_BOOT, result.version, offset, limit, sort, order, q, has_final)[:20] + '"'
+    if if_none_match and etag in [t.strip().removeprefix("W/") for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return result
 
 @router.get("/{name}", response_model=ProjectDetailResponse)
 def get_project_detail(name: str):
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import Optional
 import os
@@ -7,8 +8,13 @@ import subprocess
 
 from api.services.projects import get_project_path
 from api.services.video_manager import generate_block_video
+from api.services.block_scheduler import render_blocks
 from api.services.block_stitcher import stitch_block_videos as stitch_video_blocks
-from api.services.muxer import mux_audio_and_video 
+from api.services.muxer import mux_audio_and_video, assemble_reel
+from api.services.jobs import submit_job
+from api.services import build_graph
+from api.services.media_serving import versioned_url
+from api.services.packager import packaged_paths
 
 router = APIRouter()
 
@@ -19,74 +25,158 @@ class GenerateVideoRequest(BaseModel):
     block_id: str
     block_text: str
     user_prompt: Optional[str] = ""
+    background: bool = False  # return a job id instead of waiting for the render
+    use_llm_cache: bool = True  # False re-asks GPT-4o for plans and reranks
+    force: bool = False  # rebuild even if text, audio and prompt are unchanged
+
+
+def _accepted(job: dict) -> JSONResponse:
+    return JSONResponse(status_code=202, content=job)
+
+
+async def _packaged_urls(project_name: str, output_path: str) -> dict:
+    """preview_url / hls_url for whichever optional renditions exist."""
+    media_dir = os.path.join(get_project_path(project_name), "media")
+    urls = {}
+    for kind, path in packaged_paths(output_path).items():
+        if os.path.exists(path):
+            rel = os.path.relpath(path, media_dir).replace(os.sep, "/")
+            urls[f"{kind}_url"] = await versioned_url(project_name, rel) if kind == "preview" else f"/media/{project_name}/{rel}"
+    return urls
+
+
+async def _generate_block_video(payload: GenerateVideoRequest) -> dict:
+    url = f"/static/{payload.project_name}/media/video/{payload.block_id}.mp4"
+    video_path = os.path.join(get_project_path(payload.project_name), "media", "video", f"{payload.block_id}.mp4")
+    inputs = await build_graph.block_video_inputs(
+        payload.project_name, payload.block_id, payload.block_text, payload.user_prompt
+    )
+    if (
+        not payload.force and payload.use_llm_cache
+        and await build_graph.is_fresh(payload.project_name, f"video/{payload.block_id}", inputs, video_path)
+    ):
+        print(f"✅ {payload.block_id} is up to date, skipping")
+        return {
+            "status": "success", "video_path": video_path, "url": url, "skipped": True,
+            "media_url": await versioned_url(payload.project_name, f"video/{payload.block_id}.mp4")
+        }
 
-@router.post("/generate_block_video")
-async def generate_block_video_route(payload: GenerateVideoRequest):
     final_path = await generate_block_video(
         project_name=payload.project_name,
         block_id=payload.block_id,
         block_text=payload.block_text,
-        user_prompt=payload.user_prompt
+        user_prompt=payload.user_prompt,
+        use_llm_cache=payload.use_llm_cache
     )
     return {
         "status": "success",
         "video_path": final_path,
-        "url": f"/static/{payload.project_name}/media/video/{payload.block_id}.mp4"
+        "url": url,
+        "media_url": await versioned_url(payload.project_name, f"video/{payload.block_id}.mp4")
     }
 
+@router.post("/generate_block_video")
+async def generate_block_video_route(payload: GenerateVideoRequest):
+    if payload.background:
+        return _accepted(submit_job(
+            payload.project_name, "generate_block_video", {"block_id": payload.block_id},
+            lambda: _generate_block_video(payload)
+        ))
+    return await _generate_block_video(payload)
+
 # ---- Full Video Stitching ----
 
 class GenerateFullVideoRequest(BaseModel):
     project_name: str
+    background: bool = False
+    use_llm_cache: bool = True
+    force: bool = False  # rebuild every block and the final stitch
 
 @router.post("/generate_full_video")
 async def generate_full_video_route(payload: GenerateFullVideoRequest):
-    project_name = payload.project_name
+    project_path = get_project_path(payload.project_name)
+    script_path = os.path.join(project_path, "script.json")
+    if not os.path.exists(script_path):
+        raise HTTPException(status_code=404, detail="script.json not found")
+
+    if payload.background:
+        return _accepted(submit_job(
+            payload.project_name, "generate_full_video", {},
+            lambda: _generate_full_video(payload.project_name, payload.use_llm_cache, payload.force)
+        ))
+    return await _generate_full_video(payload.project_name, payload.use_llm_cache, payload.force)
+
+async def _generate_full_video(project_name: str, use_llm_cache: bool = True, force: bool = False) -> dict:
     project_path = get_project_path(project_name)
     video_dir = os.path.join(project_path, "media", "video")
     os.makedirs(video_dir, exist_ok=True)
 
     script_path = os.path.join(project_path, "script.json")
-    if not os.path.exists(script_path):
-        raise HTTPException(status_code=404, detail="script.json not found")
-
     with open(script_path) as f:
         script_data = json.load(f)
     blocks = script_data.get("blocks", [])
 
     print(f"📜 Found {len(blocks)} blocks in script.json")
 
+    stale = []
+    block_paths = []
     for i, block in enumerate(blocks):
         block_id = f"block_{i}"
         video_path = os.path.join(video_dir, f"{block_id}.mp4")
-        if not os.path.exists(video_path):
-            print(f"🎬 Generating video for {block_id}")
-            await generate_block_video(
-                project_name,
-                block_id,
-                block.get("text", ""),
-                user_prompt=""
-            )
+        block_paths.append(video_path)
+        # Keep the visual guidance the block was last rendered with
+        previous = build_graph.get_record(project_name, f"video/{block_id}") or {}
+        user_prompt = previous.get("user_prompt", "")
+        inputs = await build_graph.block_video_inputs(project_name, block_id, block.get("text", ""), user_prompt)
+        if force or not await build_graph.is_fresh(project_name, f"video/{block_id}", inputs, video_path):
+            stale.append((block_id, block.get("text", ""), user_prompt))
         else:
-            print(f"✅ Skipping {block_id}, already exists")
+            print(f"✅ Skipping {block_id}, up to date")
+
+    # Render all stale blocks in parallel; stitch only once every block is on disk
+    result = await render_blocks(project_name, stale, use_llm_cache=use_llm_cache)
+    if result["failed"]:
+        raise HTTPException(status_code=502, detail={
+            "message": f"{len(result['failed'])} block(s) failed to render",
+            "completed": sorted(result["completed"]),
+            "failed": result["failed"],
+        })
 
     stitched_path = os.path.join(video_dir, "final_video.mp4")
     try:
-        await stitch_video_blocks(project_name, output_path=stitched_path)
+        stitched = await stitch_video_blocks(
+            project_name, output_path=stitched_path, block_paths=block_paths, force=force
+        )
     except subprocess.CalledProcessError as e:
         raise HTTPException(status_code=500, detail=f"FFmpeg failed: {e.stderr}")
 
-    return {"success": True, "url": f"/static/{project_name}/media/video/final_video.mp4"}
+    return {
+        "success": True,
+        "url": f"/static/{project_name}/media/video/final_video.mp4",
+        "media_url": await versioned_url(project_name, "video/final_video.mp4"),
+        "rebuilt_blocks": sorted(result["completed"]),
+        "stitched": stitched,
+    }
 
 # ---- Muxing Audio & Video ----
 
 class MuxRequest(BaseModel):
     project_name: str
+    background: bool = False
+    force: bool = False
 
 @router.post("/mux_audio_video")
 async def mux_audio_video_route(payload: MuxRequest):
+    if payload.background:
+        return _accepted(submit_job(
+            payload.project_name, "mux_audio_video", {},
+            lambda: _mux_audio_video(payload.project_name, payload.force)
+        ))
+    return await _mux_audio_video(payload.project_name, payload.force)
+
+async def _mux_audio_video(project_name: str, force: bool = False) -> dict:
     try:
-        output_path = await mux_audio_and_video(payload.project_name)
+        output_path = await mux_audio_and_video(project_name, force=force)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except subprocess.CalledProcessError as e:
@@ -94,5 +184,39 @@ async def mux_audio_video_route(payload: MuxRequest):
 
     return {
         "success": True,
-        "url": f"/static/{payload.project_name}/media/mux/full_video.mp4"
-    }
\ No newline at end of file
+        "url": f"/static/{project_name}/media/mux/full_video.mp4",
+        "media_url": await versioned_url(project_name, "mux/full_video.mp4"),
+        **await _packaged_urls(project_name, output_path)
+    }
+
+# ---- Fast Reel Assembly ----
+
+class AssembleReelRequest(BaseModel):
+    project_name: str
+    background: bool = False
+    force: bool = False
+
+@router.post("/assemble_reel")
+async def assemble_reel_route(payload: AssembleReelRequest):
+    if payload.background:
+        return _accepted(submit_job(
+            payload.project_name, "assemble_reel", {},
+            lambda: _assemble_reel(payload.project_name, payload.force)
+        ))
+    return await _assemble_reel(payload.project_name, payload.force)
+
+async def _assemble_reel(project_name: str, force: bool = False) -> dict:
+    try:
+        result = await assemble_reel(project_name, force=force)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except subprocess.CalledProcessError as e:
+        raise HTTPException(status_code=500, detail=f"FFmpeg failed: {e.stderr}")
+
+    return {
+        "success": True,
+        "mode": result["mode"],
+        "url": f"/static/{project_name}/media/mux/full_video.mp4",
+        "media_url": await versioned_url(project_name, "mux/full_video.mp4"),
+        **await _packaged_urls(project_name, result["output_path"])
+    }
@@ -30,6 +30,10 @@ class ListProjectsResponse(BaseModel):
     empty: bool
     last_scan: str
     next_poll_ms: int
+    total: int = 0
+    offset: int = 0
+    limit: Optional[int] = None
+    version: int = 0  # catalog version; changes whenever any project summary changes
 
 class ProjectDetailResponse(BaseModel):
     blocks: List[BlockOut]
\ No newline at end of file
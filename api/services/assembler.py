@@ -0,0 +1,104 @@
+# api/services/assembler.py
+"""
+Fast reel assembly for blocks encoded with the canonical profile
+(CANONICAL_WIDTH x CANONICAL_HEIGHT, CANONICAL_FPS, fixed GOP, yuv420p H.264).
+
+Such blocks can be joined with ffmpeg's concat demuxer and `-c copy`, so
+assembling a reel only remuxes packets (and encodes the audio) instead of
+decoding and re-encoding every frame.
+"""
+import os
+import tempfile
+from fractions import Fraction
+from typing import List
+
+from api.config import (
+    CANONICAL_WIDTH, CANONICAL_HEIGHT, CANONICAL_FPS,
+    CANONICAL_GOP, CANONICAL_PIX_FMT, CANONICAL_CODEC,
+)
+from . import jobs
+from . import media_probe
+from .media_exec import run_remux
+
+# Scale/crop any source to fill the canonical 9:16 frame
+CANONICAL_FILTER = (
+    f"scale={CANONICAL_WIDTH}:{CANONICAL_HEIGHT}:force_original_aspect_ratio=increase,"
+    f"crop={CANONICAL_WIDTH}:{CANONICAL_HEIGHT},setsar=1"
+)
+
+# Put the moov atom first so browsers can start playback before the download ends
+FASTSTART_ARGS = ["-movflags", "+faststart"]
+
+# Encoder options of the canonical profile (for use with a filter graph)
+CANONICAL_ENCODE_ARGS = [
+    "-c:v", "libx264",
+    "-r", str(CANONICAL_FPS),
+    "-g", str(CANONICAL_GOP),
+    "-keyint_min", str(CANONICAL_GOP),
+    "-sc_threshold", "0",
+    "-pix_fmt", CANONICAL_PIX_FMT,
+    "-profile:v", "high",
+] + FASTSTART_ARGS
+
+# Output options that put a single-input encode into the canonical profile
+CANONICAL_VIDEO_ARGS = ["-vf", CANONICAL_FILTER] + CANONICAL_ENCODE_ARGS[2:]
+
+
+async def is_canonical(path: str) -> bool:
+    try:
+        info = await media_probe.probe(path)
+    except Exception:
+        return False
+    video = [s for s in info.get("streams", []) if s.get("codec_type") == "video"]
+    if len(video) != 1:
+        return False
+    v = video[0]
+    try:
+        fps = Fraction(v.get("r_frame_rate", "0/1"))
+    except (ValueError, ZeroDivisionError):
+        return False
+    return (
+        v.get("codec_name") == CANONICAL_CODEC
+        and v.get("width") == CANONICAL_WIDTH
+        and v.get("height") == CANONICAL_HEIGHT
+        and v.get("pix_fmt") == CANONICAL_PIX_FMT
+        and fps == CANONICAL_FPS
+    )
+
+
+async def all_canonical(paths: List[str]) -> bool:
+    for path in paths:
+        if not await is_canonical(path):
+            return False
+    return True
+
+
+def _write_concat_list(paths: List[str]) -> str:
+    tmp = tempfile.NamedTemporaryFile("w", delete=False, suffix=".txt", encoding="utf-8")
+    with tmp:
+        for path in paths:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            tmp.write(f"file '{escaped}'\n")
+    return tmp.name
+
+
+async def concat_copy(block_paths: List[str], output_path: str, audio_path: str = None) -> str:
+    """
+    Joins canonical block videos with `-c copy`. When `audio_path` is given the
+    audio is muxed in the same ffmpeg invocation.
+    """
+    list_path = _write_concat_list(block_paths)
+    cmd = ["ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_path]
+    if audio_path:
+        cmd += ["-i", audio_path, "-map", "0:v:0", "-map", "1:a:0", "-c:a", "aac", "-shortest"]
+    cmd += ["-c:v", "copy", *FASTSTART_ARGS, output_path]
+
+    stage = "mux" if audio_path else "stitch"
+    jobs.add_work(stage)
+    try:
+        print(f"⚡ Concat (stream copy) of {len(block_paths)} blocks -> {output_path}")
+        await run_remux(cmd)
+    finally:
+        os.remove(list_path)
+    jobs.advance(stage)
+    return output_path
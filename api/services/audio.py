@@ -1,39 +1,85 @@
 # api/services/audio.py
 import os
 import json
+import uuid
+import asyncio
 from pathlib import Path
-import httpx
+from typing import AsyncIterator, List, Optional, Tuple
 from fastapi import HTTPException
 from datetime import datetime
-from pydub import AudioSegment
 
 from api.config import PROJECTS_DIR
-from api.services.projects import _read_json_safe, atomic_write_json, update_block_text
+from api.services.projects import _read_json_safe, update_block_text, block_sort_key
+from api.services import jobs, limits, build_graph, events, metadata_store
+from api.services.audio_assembler import assemble_audio
+from api.services.media_serving import versioned_url
+from api.services.http_clients import get_client
+from api.services.resilience import call, http_status_for
 
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 ELEVENLABS_BASE = "https://api.elevenlabs.io/v1"
+ELEVENLABS_MODEL_ID = "eleven_monolingual_v1"
+AUDIO_META = os.path.join("media", "audio", "audio.json")
 
-def generate_audio_service(project: str, block_id: str, text: str, voice_id: str) -> dict:
+async def generate_audio_service(project: str, block_id: str, text: str, voice_id: str, force: bool = False) -> dict:
     project_dir = os.path.join(PROJECTS_DIR, project)
     script_path = os.path.join(project_dir, "script.json")
     media_dir = os.path.join(project_dir, "media", "audio")
     audio_file = os.path.join(media_dir, f"{block_id}.mp3")
-    audio_json_path = os.path.join(media_dir, "audio.json")
 
     if not os.path.exists(script_path):
         raise HTTPException(status_code=404, detail="Project not found")
 
     os.makedirs(media_dir, exist_ok=True)
 
-    update_block_text(project, block_id, text)
+    audio_url = f"/static/{project}/media/audio/{block_id}.mp3"
+    inputs = build_graph.audio_inputs(text, voice_id, ELEVENLABS_MODEL_ID)
+    if not force and await build_graph.is_fresh(project, f"audio/{block_id}", inputs, audio_file):
+        print(f"✅ Audio for {block_id} is up to date, skipping TTS")
+        return {
+            "success": True, "audio_url": audio_url, "voice_id": voice_id, "skipped": True,
+            "media_url": await versioned_url(project, f"audio/{block_id}.mp3")
+        }
+
+    await update_block_text(project, block_id, text)
+
+    try:
+        await _synthesize_to_file(text, voice_id, audio_file)
+    except Exception as e:
+        raise HTTPException(status_code=http_status_for(e), detail=f"Audio generation failed: {e}")
+
+    await build_graph.record(project, f"audio/{block_id}", inputs, audio_file)
+    events.publish(project, "audio_ready", block_id=block_id, url=f"/static/{project}/media/audio/{block_id}.mp3")
+
+    entry = _audio_entry(project, block_id, voice_id)
+    await metadata_store.update_async(project, AUDIO_META, lambda meta: meta.__setitem__(block_id, entry))
+
+    return {
+        "success": True,
+        "audio_url": audio_url,
+        "voice_id": voice_id,
+        "media_url": await versioned_url(project, f"audio/{block_id}.mp3")
+    }
+
+def _audio_entry(project: str, block_id: str, voice_id: str) -> dict:
+    return {
+        "voice_id": voice_id,
+        "updated_at": datetime.utcnow().isoformat(),
+        "url": f"/static/{project}/media/audio/{block_id}.mp3",
+    }
 
+async def _synthesize_to_file(text: str, voice_id: str, audio_file: str) -> None:
+    """
+    Streams the ElevenLabs rendition of `text` into `audio_file` through the
+    shared async client and the resilience layer.
+    """
     headers = {
         "xi-api-key": ELEVENLABS_API_KEY,
         "Content-Type": "application/json",
     }
     payload = {
         "text": text,
-        "model_id": "eleven_monolingual_v1",
+        "model_id": ELEVENLABS_MODEL_ID,
         "voice_settings": {
             "stability": 0.5,
             "similarity_boost": 0.5
@@ -42,32 +88,199 @@ def generate_audio_service(project: str, block_id: str, text: str, voice_id: str
 
     url = f"{ELEVENLABS_BASE}/text-to-speech/{voice_id}"
 
-    try:
-        with httpx.stream("POST", url, headers=headers, json=payload, timeout=60.0) as res:
+    async def _synthesize():
+        client = get_client("elevenlabs")
+        async with client.stream("POST", url, headers=headers, json=payload) as res:
             if res.status_code != 200:
-                raise HTTPException(status_code=500, detail="Audio generation failed")
-            with open(audio_file, "wb") as out_file:
-                for chunk in res.iter_bytes():
-                    out_file.write(chunk)
+                await res.aread()
+                res.raise_for_status()
+            # Stream into a private part file; the mp3 only appears once complete
+            part_path = f"{audio_file}.{uuid.uuid4().hex}.part"
+            try:
+                with open(part_path, "wb") as out_file:
+                    async for chunk in res.aiter_bytes():
+                        out_file.write(chunk)
+                os.replace(part_path, audio_file)
+            finally:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+
+    await call("elevenlabs", _synthesize)
+
+def _block_text_and_voice(project: str, block_id: str, voice_id: Optional[str]) -> Tuple[str, str]:
+    project_dir = os.path.join(PROJECTS_DIR, project)
+    script_path = os.path.join(project_dir, "script.json")
+    if not os.path.exists(script_path):
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    blocks = _read_json_safe(script_path).get("blocks", [])
+    try:
+        text = blocks[int(block_id.replace("block_", ""))].get("text", "")
+    except (IndexError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Invalid block_id: {block_id}")
+
+    audio_meta = metadata_store.read(project, AUDIO_META)
+    voice = voice_id or audio_meta.get(block_id, {}).get("voice_id")
+    if not voice:
+        raise HTTPException(status_code=400, detail=f"No voice_id given and none recorded for {block_id}")
+    return text, voice
+
+async def cached_block_audio(project: str, block_id: str, voice_id: Optional[str] = None) -> Optional[str]:
+    """
+    Path of the block's mp3 if it is up to date with the script text and voice, else None.
+    """
+    text, voice = _block_text_and_voice(project, block_id, voice_id)
+    audio_file = os.path.join(PROJECTS_DIR, project, "media", "audio", f"{block_id}.mp3")
+    inputs = build_graph.audio_inputs(text, voice, ELEVENLABS_MODEL_ID)
+    return audio_file if await build_graph.is_fresh(project, f"audio/{block_id}", inputs, audio_file) else None
+
+async def open_block_audio_stream(project: str, block_id: str, voice_id: Optional[str] = None) -> AsyncIterator[bytes]:
+    """
+    Starts an ElevenLabs streaming synthesis of the block's script text and
+    returns an iterator over the audio chunks as they arrive. The same bytes
+    are teed to media/audio/{block_id}.mp3; the file (and audio.json / build
+    record) is only committed once the stream completes.
+    Provider errors are raised here, before any byte is yielded.
+    """
+    text, voice = _block_text_and_voice(project, block_id, voice_id)
+    media_dir = os.path.join(PROJECTS_DIR, project, "media", "audio")
+    os.makedirs(media_dir, exist_ok=True)
+    audio_file = os.path.join(media_dir, f"{block_id}.mp3")
+    inputs = build_graph.audio_inputs(text, voice, ELEVENLABS_MODEL_ID)
+
+    client = get_client("elevenlabs")
+    request = client.build_request(
+        "POST",
+        f"{ELEVENLABS_BASE}/text-to-speech/{voice}/stream",
+        headers={"xi-api-key": ELEVENLABS_API_KEY, "Content-Type": "application/json"},
+        json={
+            "text": text,
+            "model_id": ELEVENLABS_MODEL_ID,
+            "voice_settings": {"stability": 0.5, "similarity_boost": 0.5}
+        }
+    )
+
+    async def _open():
+        res = await client.send(request, stream=True)
+        if res.status_code != 200:
+            await res.aread()
+            await res.aclose()
+            res.raise_for_status()
+        return res
+
+    try:
+        res = await call("elevenlabs", _open)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=http_status_for(e), detail=f"Audio generation failed: {e}")
 
-    audio_meta = _read_json_safe(audio_json_path)
-    audio_url = f"/static/{project}/media/audio/{block_id}.mp3"
-    audio_meta[block_id] = {
-        "voice_id": voice_id,
-        "updated_at": datetime.utcnow().isoformat(),
-        "url": audio_url,
-    }
-    atomic_write_json(audio_json_path, audio_meta)
+    async def _tee():
+        part_path = f"{audio_file}.{uuid.uuid4().hex}.part"
+        completed = False
+        try:
+            with open(part_path, "wb") as out_file:
+                async for chunk in res.aiter_bytes():
+                    out_file.write(chunk)
+                    yield chunk
+            completed = True
+        finally:
+            # Settle the part file before any await: on client disconnect the
+            # stream is cancelled and a later await here would be cancelled too
+            try:
+                if completed:
+                    os.replace(part_path, audio_file)
+                elif os.path.exists(part_path):
+                    os.remove(part_path)  # client went away mid-stream
+            finally:
+                await asyncio.shield(res.aclose())
+            if completed:
+                await build_graph.record(project, f"audio/{block_id}", inputs, audio_file)
+                events.publish(project, "audio_ready", block_id=block_id, url=f"/static/{project}/media/audio/{block_id}.mp3")
+                entry = _audio_entry(project, block_id, voice)
+                await metadata_store.update_async(project, AUDIO_META, lambda meta: meta.__setitem__(block_id, entry))
+
+    return _tee()
+
+async def generate_project_audio_service(
+    project: str,
+    voice_id: Optional[str] = None,
+    block_ids: Optional[List[str]] = None,
+    force: bool = False
+) -> dict:
+    """
+    Synthesizes every block of the project (or just `block_ids`) concurrently,
+    bounded by TTS_CONCURRENCY. Blocks whose text and voice are unchanged are
+    skipped. Without `voice_id`, each block keeps the voice it was last voiced with.
+    audio.json is written once at the end.
+    """
+    project_dir = os.path.join(PROJECTS_DIR, project)
+    script_path = os.path.join(project_dir, "script.json")
+    media_dir = os.path.join(project_dir, "media", "audio")
+
+    if not os.path.exists(script_path):
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    blocks = _read_json_safe(script_path).get("blocks", [])
+    all_ids = [f"block_{i}" for i in range(len(blocks))]
+    wanted = all_ids if block_ids is None else block_ids
+    unknown = [b for b in wanted if b not in all_ids]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid block_id: {', '.join(unknown)}")
+
+    os.makedirs(media_dir, exist_ok=True)
+    audio_meta = metadata_store.read(project, AUDIO_META)
+
+    plan = []
+    for block_id in wanted:
+        voice = voice_id or audio_meta.get(block_id, {}).get("voice_id")
+        if not voice:
+            raise HTTPException(status_code=400, detail=f"No voice_id given and none recorded for {block_id}")
+        plan.append((block_id, blocks[all_ids.index(block_id)].get("text", ""), voice))
+
+    jobs.add_work("tts", len(plan))
+    entries = {}
+
+    async def _one(block_id: str, text: str, voice: str) -> str:
+        audio_file = os.path.join(media_dir, f"{block_id}.mp3")
+        inputs = build_graph.audio_inputs(text, voice, ELEVENLABS_MODEL_ID)
+        if not force and await build_graph.is_fresh(project, f"audio/{block_id}", inputs, audio_file):
+            jobs.advance("tts")
+            return "skipped"
+        async with limits.tts_slots:
+            await _synthesize_to_file(text, voice, audio_file)
+        await build_graph.record(project, f"audio/{block_id}", inputs, audio_file)
+        events.publish(project, "audio_ready", block_id=block_id, url=f"/static/{project}/media/audio/{block_id}.mp3")
+        entries[block_id] = _audio_entry(project, block_id, voice)
+        jobs.advance("tts")
+        return "generated"
+
+    results = await asyncio.gather(*(_one(*p) for p in plan), return_exceptions=True)
+
+    generated, skipped, failed = [], [], {}
+    for (block_id, _, _), result in zip(plan, results):
+        if isinstance(result, BaseException):
+            failed[block_id] = str(result)
+        elif result == "skipped":
+            skipped.append(block_id)
+        else:
+            generated.append(block_id)
+
+    if entries:
+        await metadata_store.update_async(project, AUDIO_META, lambda meta: meta.update(entries))
 
     return {
-        "success": True,
-        "audio_url": audio_url,
-        "voice_id": voice_id
+        "success": not failed,
+        "generated": generated,
+        "skipped": skipped,
+        "failed": failed,
+        "urls": {b: f"/static/{project}/media/audio/{b}.mp3" for b in wanted if b not in failed},
     }
 
-def generate_full_audio_service(project: str) -> dict:
+async def generate_full_audio_service(
+    project: str,
+    force: bool = False,
+    gap_ms: int = 0,
+    crossfade_ms: int = 0
+) -> dict:
     project_dir = os.path.join(PROJECTS_DIR, project)
     media_dir = os.path.join(project_dir, "media", "audio")
     audio_json_path = os.path.join(media_dir, "audio.json")
@@ -80,31 +293,39 @@ def generate_full_audio_service(project: str) -> dict:
 
     audio_meta = _read_json_safe(audio_json_path)
 
-    segments = []
-
-    for block_id, entry in audio_meta.items():
+    audio_paths = []
+    for block_id in sorted(audio_meta, key=block_sort_key):
         audio_path = os.path.join(media_dir, f"{block_id}.mp3")
 
         if not os.path.exists(audio_path):
             continue  # skip missing files
 
-        try:
-            segment = AudioSegment.from_mp3(audio_path)
-            segments.append(segment)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error loading {block_id}.mp3: {e}")
+        audio_paths.append(audio_path)
 
-    if not segments:
+    if not audio_paths:
         raise HTTPException(status_code=400, detail="No audio segments available to merge")
 
-    final = segments[0]
-    for seg in segments[1:]:
-        final += seg
+    inputs = {**(await build_graph.files_inputs(audio_paths)), "gap_ms": gap_ms, "crossfade_ms": crossfade_ms}
+    if not force and await build_graph.is_fresh(project, "full_audio", inputs, full_audio_path):
+        print("✅ Full audio is up to date, skipping merge")
+        return {
+            "success": True,
+            "url": f"/static/{project}/media/audio/full_audio.mp3",
+            "media_url": await versioned_url(project, "audio/full_audio.mp3"),
+            "updated_at": build_graph.get_record(project, "full_audio")["built_at"],
+            "skipped": True
+        }
+
+    try:
+        await assemble_audio(audio_paths, full_audio_path, gap_ms=gap_ms, crossfade_ms=crossfade_ms)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Audio merge failed: {getattr(e, 'stderr', None) or e}")
 
-    final.export(full_audio_path, format="mp3")
+    await build_graph.record(project, "full_audio", inputs, full_audio_path)
 
     return {
         "success": True,
         "url": f"/static/{project}/media/audio/full_audio.mp3",
+        "media_url": await versioned_url(project, "audio/full_audio.mp3"),
         "updated_at": datetime.utcnow().isoformat()
     }
\ No newline at end of file
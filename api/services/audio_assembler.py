@@ -0,0 +1,99 @@
+# api/services/audio_assembler.py
+"""
+Streaming assembly of block narrations into one track.
+
+When every block shares codec, sample rate and channel layout (the normal case
+for ElevenLabs output) and no gaps or crossfades are requested, the MP3 frames
+are joined losslessly with the concat demuxer. Otherwise one ffmpeg filter
+graph decodes the blocks as streams, inserts silence or crossfades, and encodes
+once. Either way ffmpeg holds only a few frames at a time, so memory stays flat
+and work is linear in the number of blocks.
+"""
+import os
+from typing import List
+
+from . import jobs, media_probe
+from .assembler import _write_concat_list
+from .media_exec import run_ffmpeg, run_remux
+
+
+async def formats_match(paths: List[str]) -> bool:
+    formats = set()
+    for path in paths:
+        info = await media_probe.audio_info(path)
+        if info is None:
+            return False
+        formats.add((info["codec"], info["sample_rate"], info["channels"]))
+    return len(formats) == 1
+
+
+def build_audio_graph(count: int, gap_ms: int = 0, crossfade_ms: int = 0) -> str:
+    """
+    Filter graph joining `count` audio inputs, either with `crossfade_ms`
+    overlaps or separated by `gap_ms` of silence.
+    """
+    # Bring every input to a common format so concat/acrossfade accept them
+    chains = [
+        f"[{i}:a]aresample=44100,aformat=sample_fmts=fltp:channel_layouts=stereo[a{i}]"
+        for i in range(count)
+    ]
+    if count == 1:
+        chains.append("[a0]anull[out]")
+    elif crossfade_ms > 0:
+        previous = "a0"
+        for i in range(1, count):
+            label = "out" if i == count - 1 else f"x{i}"
+            chains.append(f"[{previous}][a{i}]acrossfade=d={crossfade_ms / 1000:.3f}[{label}]")
+            previous = label
+    else:
+        labels = []
+        for i in range(count):
+            if gap_ms > 0 and i < count - 1:
+                chains.append(f"[a{i}]apad=pad_dur={gap_ms / 1000:.3f}[p{i}]")
+                labels.append(f"[p{i}]")
+            else:
+                labels.append(f"[a{i}]")
+        chains.append(f"{''.join(labels)}concat=n={count}:v=0:a=1[out]")
+    return ";".join(chains)
+
+
+async def assemble_audio(
+    audio_paths: List[str],
+    output_path: str,
+    gap_ms: int = 0,
+    crossfade_ms: int = 0
+) -> str:
+    """
+    Joins `audio_paths` in order into `output_path` (MP3). Returns the mode used:
+    "copy" for a lossless frame join, "filter" for a single-pass re-encode.
+    """
+    if not audio_paths:
+        raise ValueError("No audio segments to assemble")
+
+    jobs.add_work("stitch")
+    if gap_ms <= 0 and crossfade_ms <= 0 and await formats_match(audio_paths):
+        list_path = _write_concat_list(audio_paths)
+        try:
+            await run_remux([
+                "ffmpeg", "-y", "-f", "concat", "-safe", "0", "-i", list_path,
+                "-map", "0:a", "-c", "copy", output_path
+            ])
+        finally:
+            os.remove(list_path)
+        mode = "copy"
+    else:
+        cmd = ["ffmpeg", "-y"]
+        for path in audio_paths:
+            cmd += ["-i", path]
+        cmd += [
+            "-filter_complex", build_audio_graph(len(audio_paths), gap_ms, crossfade_ms),
+            "-map", "[out]",
+            "-c:a", "libmp3lame", "-q:a", "2",
+            output_path
+        ]
+        await run_ffmpeg(cmd)
+        mode = "filter"
+    jobs.advance("stitch")
+
+    print(f"🔊 Assembled {len(audio_paths)} audio blocks ({mode}) -> {output_path}")
+    return mode
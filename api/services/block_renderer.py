@@ -0,0 +1,66 @@
+# api/services/block_renderer.py
+"""
+Renders a block video with a single ffmpeg filter graph.
+
+Each scene clip is scaled/cropped to 9:16, normalised to the canonical frame
+rate and padded with a freeze-frame of its last picture up to its slot, then
+all scenes are concatenated and encoded once in the canonical profile. Frames
+never pass through Python, unlike the moviepy compose path.
+"""
+from typing import List, Tuple
+
+from api.config import CANONICAL_FPS, BLOCK_SCENE_PAD_SEC
+from .assembler import CANONICAL_FILTER, CANONICAL_ENCODE_ARGS
+from .media_exec import run_ffmpeg
+
+
+def build_filter_graph(slots: List[Tuple[float, float]]) -> str:
+    """
+    Filter graph for len(slots) video inputs, one (clip seconds, slot seconds)
+    pair per input. Scene i plays its clip and holds the last frame only for
+    the gap between the clip and its slot, so the slot is exactly filled.
+    """
+    chains = []
+    for i, (clip_sec, slot_sec) in enumerate(slots):
+        # Unknown clip length (probe failed): allow a freeze of the whole slot
+        hold = slot_sec - min(clip_sec, slot_sec) if clip_sec > 0 else slot_sec
+        chains.append(
+            f"[{i}:v]trim=duration={slot_sec:.3f},setpts=PTS-STARTPTS,"
+            f"{CANONICAL_FILTER},fps={CANONICAL_FPS},"
+            f"tpad=stop_mode=clone:stop_duration={hold:.3f},"
+            f"trim=duration={slot_sec:.3f},setpts=PTS-STARTPTS[v{i}]"
+        )
+    labels = "".join(f"[v{i}]" for i in range(len(slots)))
+    chains.append(f"{labels}concat=n={len(slots)}:v=1:a=0[out]")
+    return ";".join(chains)
+
+
+async def render_block(
+    segments: List[Tuple[str, float, float]],
+    output_path: str,
+    extra_duration: float = BLOCK_SCENE_PAD_SEC
+) -> str:
+    """
+    Encodes `segments` — (clip path, achieved clip seconds, target seconds)
+    triples — into `output_path`. Each scene gets `extra_duration` seconds of
+    freeze-frame on top of its target.
+    Raises CalledProcessError if ffmpeg fails.
+    """
+    if not segments:
+        raise ValueError("render_block needs at least one segment")
+
+    cmd = ["ffmpeg", "-y"]
+    for path, _, _ in segments:
+        cmd += ["-i", path]
+    slots = [(float(clip or 0), float(target) + extra_duration) for _, clip, target in segments]
+    cmd += [
+        "-filter_complex", build_filter_graph(slots),
+        "-map", "[out]",
+        "-an",
+    ]
+    cmd += CANONICAL_ENCODE_ARGS
+    cmd.append(output_path)
+
+    print(f"🎞️ Rendering {len(segments)} scenes with ffmpeg -> {output_path}")
+    await run_ffmpeg(cmd)
+    return output_path
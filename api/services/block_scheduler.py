@@ -0,0 +1,56 @@
+# api/services/block_scheduler.py
+import asyncio
+from typing import List, Tuple
+
+from . import limits
+from .video_manager import generate_block_video
+
+
+async def _render_block(
+    project_name: str,
+    block_id: str,
+    block_text: str,
+    user_prompt: str,
+    use_llm_cache: bool
+) -> str:
+    async with limits.block_slots:
+        print(f"🎬 Generating video for {block_id}")
+        path = await generate_block_video(
+            project_name,
+            block_id,
+            block_text,
+            user_prompt=user_prompt,
+            use_llm_cache=use_llm_cache
+        )
+        print(f"✅ Finished {block_id}")
+        return path
+
+
+async def render_blocks(
+    project_name: str,
+    blocks: List[Tuple[str, str, str]],
+    use_llm_cache: bool = True
+) -> dict:
+    """
+    Renders (block_id, block_text, user_prompt) tuples concurrently, at most BLOCK_CONCURRENCY at a time.
+    External API calls and encodes stay bounded by the shared limits in `limits`.
+    A failing block never cancels the others; its error is reported instead.
+
+    Returns {"completed": {block_id: path}, "failed": {block_id: error}}.
+    """
+    results = await asyncio.gather(
+        *(_render_block(project_name, block_id, text, prompt, use_llm_cache) for block_id, text, prompt in blocks),
+        return_exceptions=True,
+    )
+
+    completed, failed = {}, {}
+    for (block_id, _, _), result in zip(blocks, results):
+        if isinstance(result, asyncio.CancelledError):
+            raise result
+        if isinstance(result, BaseException):
+            print(f"❌ {block_id} failed: {result}")
+            failed[block_id] = str(result) or type(result).__name__
+        else:
+            completed[block_id] = result
+
+    return {"completed": completed, "failed": failed}
@@ -1,17 +1,49 @@
 import os
 import subprocess
+from typing import List, Optional
 
-async def stitch_block_videos(project_name: str, output_path: str):
+from . import jobs, build_graph, events
+from .media_exec import run_ffmpeg
+from .assembler import all_canonical, concat_copy, FASTSTART_ARGS
+from .packager import package_output
+from .projects import block_sort_key
+
+async def stitch_block_videos(
+    project_name: str,
+    output_path: str,
+    block_paths: Optional[List[str]] = None,
+    force: bool = False
+) -> bool:
+    """
+    Concatenates the block videos (all block_*.mp4 in numeric order unless
+    `block_paths` is given) into `output_path`.
+    Returns False without re-encoding when the output is already up to date.
+    """
     video_dir = os.path.join("projects", project_name, "media", "video")
-    block_files = sorted([
-        f for f in os.listdir(video_dir)
-        if f.startswith("block_") and f.endswith(".mp4")
-    ])
+    if block_paths is None:
+        block_files = sorted([
+            f for f in os.listdir(video_dir)
+            if f.startswith("block_") and f.endswith(".mp4")
+        ], key=block_sort_key)
+        block_paths = [os.path.join(video_dir, f) for f in block_files]
 
-    if not block_files:
+    if not block_paths:
         raise FileNotFoundError("No block video segments found.")
 
-    input_paths = [os.path.join(video_dir, f) for f in block_files]
+    inputs = await build_graph.files_inputs(block_paths)
+    if not force and await build_graph.is_fresh(project_name, "final_video", inputs, output_path):
+        print("✅ Final video is up to date, skipping stitch")
+        return False
+
+    # Blocks rendered with the canonical profile only need a stream-copy concat
+    if await all_canonical(block_paths):
+        await concat_copy(block_paths, output_path)
+        await build_graph.record(project_name, "final_video", inputs, output_path)
+        await package_output(project_name, output_path, force=force)
+        events.publish(project_name, "final_ready", artifact="final_video")
+        return True
+
+    input_paths = block_paths
     input_args = []
     scale_labels = []
     concat_labels = []
@@ -41,13 +73,20 @@ async def stitch_block_videos(project_name: str, output_path: str):
         "-crf", "23",
         "-preset", "fast",
         "-pix_fmt", "yuv420p",
+        *FASTSTART_ARGS,
         output_path
     ]
 
     print(f"[STITCH] Running fixed FFmpeg command with scaling inside filter_complex")
 
+    jobs.add_work("stitch")
     try:
-        subprocess.run(cmd, check=True)
+        await run_ffmpeg(cmd)
     except subprocess.CalledProcessError as e:
         print("❌ FFmpeg concat filter failed:", e)
-        raise
\ No newline at end of file
+        raise
+    jobs.advance("stitch")
+    await build_graph.record(project_name, "final_video", inputs, output_path)
+    await package_output(project_name, output_path, force=force)
+    events.publish(project_name, "final_ready", artifact="final_video")
+    return True
@@ -0,0 +1,162 @@
+# api/services/build_graph.py
+"""
+Dependency tracking for rendered artifacts ("make for reels").
+
+Each project keeps a build.json that maps an artifact name to the hash of
+the inputs it was built from and the content hash of the output:
+
+    audio/block_0   <- block text, voice id
+    video/block_0   <- block text, audio file, user prompt
+                       (+ scene plan and selected clips, recorded after planning)
+    full_audio      <- every block mp3, in order
+    final_video     <- every block mp4, in order
+    mux             <- final_video.mp4, full_audio.mp3
+
+An artifact is fresh when its output exists, still has the recorded
+content hash, and its inputs hash matches. Endpoints rebuild only what is
+not fresh. Content hashes are reused while a file's size and mtime are
+unchanged, and files that must be read are hashed off the event loop.
+"""
+import os
+import json
+import asyncio
+import hashlib
+from typing import Dict, Optional, Tuple
+
+from api.config import PROJECTS_DIR
+from api.utils.fs import now_iso
+from api.utils.disk_cache import hash_key
+from api.services import metadata_store
+
+_CHUNK = 1024 * 1024
+_fingerprints: Dict[str, Tuple[int, int, str]] = {}
+
+
+def _build_path(project: str) -> str:
+    return os.path.join(PROJECTS_DIR, project, "build.json")
+
+
+def _load(project: str) -> dict:
+    try:
+        with open(_build_path(project), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _stat(path: str) -> Optional[os.stat_result]:
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
+
+
+def _project_rel(path: str) -> Tuple[Optional[str], str]:
+    """(project, path relative to the project dir) for a path under PROJECTS_DIR."""
+    rel = os.path.relpath(os.path.realpath(path), os.path.realpath(PROJECTS_DIR))
+    parts = rel.replace(os.sep, "/").split("/", 1)
+    if len(parts) < 2 or parts[0] in ("..", "."):
+        return None, rel
+    return parts[0], parts[1]
+
+
+def _known_fingerprint(path: str, st: os.stat_result) -> Optional[str]:
+    """
+    Hash without reading the file: the in-process cache, or the hash build.json
+    recorded for this output when it was rendered, as long as size and mtime
+    still match.
+    """
+    cached = _fingerprints.get(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    project, rel = _project_rel(path)
+    if project is None:
+        return None
+    stamp = [st.st_size, st.st_mtime_ns]
+    for entry in _load(project).values():
+        if isinstance(entry, dict) and entry.get("path") == rel and entry.get("stat") == stamp and entry.get("output"):
+            _fingerprints[path] = (st.st_mtime_ns, st.st_size, entry["output"])
+            return entry["output"]
+    return None
+
+
+def _hash_file(path: str, st: os.stat_result) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    fingerprint = digest.hexdigest()
+    _fingerprints[path] = (st.st_mtime_ns, st.st_size, fingerprint)
+    return fingerprint
+
+
+async def fingerprint(path: str) -> Optional[str]:
+    """
+    sha256 of the file's content, cached by (mtime, size). None if the file is
+    missing. A file that has to be read is hashed in a worker thread so large
+    videos never stall the event loop.
+    """
+    st = _stat(path)
+    if st is None:
+        return None
+    return _known_fingerprint(path, st) or await asyncio.to_thread(_hash_file, path, st)
+
+
+def inputs_hash(inputs: dict) -> str:
+    return hash_key(inputs)
+
+
+def get_record(project: str, artifact: str) -> Optional[dict]:
+    return _load(project).get(artifact)
+
+
+async def is_fresh(project: str, artifact: str, inputs: dict, output_path: str) -> bool:
+    entry = get_record(project, artifact)
+    if not entry or entry.get("inputs") != inputs_hash(inputs):
+        return False
+    output = await fingerprint(output_path)
+    return output is not None and entry.get("output") == output
+
+
+async def record(project: str, artifact: str, inputs: dict, output_path: str, **extra) -> dict:
+    """
+    Stores the inputs hash and output content hash for `artifact`, plus any extra
+    details (e.g. the scene plan) worth keeping for the next build. The output's
+    path, size and mtime are kept too, so later lookups can reuse the hash
+    without reading the file again.
+    """
+    st = _stat(output_path)
+    entry = {
+        "inputs": inputs_hash(inputs),
+        "output": await fingerprint(output_path),
+        "path": _project_rel(output_path)[1],
+        "stat": [st.st_size, st.st_mtime_ns] if st else None,
+        "built_at": now_iso(),
+        **extra,
+    }
+    await metadata_store.update_async(project, "build.json", lambda graph: graph.__setitem__(artifact, entry))
+    return entry
+
+
+async def invalidate(project: str, *artifacts: str) -> None:
+    removed = await metadata_store.update_async(
+        project, "build.json",
+        lambda graph: [a for a in artifacts if graph.pop(a, None) is not None]
+    )
+    if removed:
+        print(f"♻️ Invalidated {', '.join(removed)} in {project}")
+
+
+# ---- Input descriptions shared by the endpoints ----
+
+def audio_inputs(text: str, voice_id: str, model_id: str) -> dict:
+    return {"text": text, "voice_id": voice_id, "model_id": model_id}
+
+
+async def block_video_inputs(project: str, block_id: str, text: str, user_prompt: str = "") -> dict:
+    audio_path = os.path.join(PROJECTS_DIR, project, "media", "audio", f"{block_id}.mp3")
+    return {"text": text, "audio": await fingerprint(audio_path), "user_prompt": user_prompt or ""}
+
+
+async def files_inputs(paths) -> dict:
+    return {"files": [[os.path.basename(p), await fingerprint(p)] for p in paths]}
@@ -0,0 +1,152 @@
+# api/services/catalog.py
+"""
+In-memory catalog of project summaries behind GET /projects.
+
+Write paths (project creation, block edits, renders) call `refresh(name)` so
+the entry is current immediately. Changes made outside the app are picked up
+by a stat-only rescan (no JSON parsing unless a file's mtime changed), run at
+most every CATALOG_RESCAN_SEC seconds.
+"""
+import os
+import json
+import time
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from api.config import PROJECTS_DIR, CATALOG_RESCAN_SEC
+
+# Files whose presence marks a project as having a finished reel
+FINAL_OUTPUTS = (
+    os.path.join("media", "mux", "full_video.mp4"),
+    os.path.join("media", "final", "output.mp4"),
+)
+
+SORT_KEYS = ("updated_at", "name", "title", "blocks")
+
+_lock = threading.Lock()
+_entries: Dict[str, dict] = {}
+_stamps: Dict[str, Tuple] = {}
+_last_rescan = 0.0
+_version = 0  # bumped whenever any entry changes; drives the list ETag
+
+
+def _read_json(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _mtime(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _stamp(pdir: str) -> Tuple:
+    return (
+        _mtime(os.path.join(pdir, "project.json")),
+        _mtime(os.path.join(pdir, "script.json")),
+    ) + tuple(_mtime(os.path.join(pdir, p)) for p in FINAL_OUTPUTS)
+
+
+def _summarize(name: str, pdir: str) -> Optional[dict]:
+    project_path = os.path.join(pdir, "project.json")
+    script_path = os.path.join(pdir, "script.json")
+    if not os.path.isfile(project_path) or not os.path.isfile(script_path):
+        return None  # incomplete project
+
+    pj = _read_json(project_path)
+    sj = _read_json(script_path)
+    return {
+        "name": name,
+        "title": pj.get("title", name),
+        "style": pj.get("style", ""),
+        "updated_at": pj.get("updated_at") or pj.get("created_at") or datetime.now(timezone.utc).isoformat(),
+        "blocks": len(sj.get("blocks", [])),
+        "has_final": any(os.path.isfile(os.path.join(pdir, p)) for p in FINAL_OUTPUTS),
+    }
+
+
+def _refresh_locked(name: str, force: bool = False) -> None:
+    pdir = os.path.join(PROJECTS_DIR, name)
+    stamp = _stamp(pdir)
+    if not force and _stamps.get(name) == stamp and name in _entries:
+        return
+    global _version
+    entry = _summarize(name, pdir) if os.path.isdir(pdir) else None
+    if entry is None:
+        if _entries.pop(name, None) is not None:
+            _version += 1
+        _stamps.pop(name, None)
+    else:
+        if _entries.get(name) != entry:
+            _version += 1
+        _entries[name] = entry
+        _stamps[name] = stamp
+
+
+def refresh(name: str) -> None:
+    """
+    Re-indexes one project after the app wrote to it (or removes it if gone).
+    """
+    with _lock:
+        _refresh_locked(name, force=True)
+
+
+def _rescan_locked() -> None:
+    global _last_rescan
+    names = set()
+    if os.path.isdir(PROJECTS_DIR):
+        with os.scandir(PROJECTS_DIR) as it:
+            for de in it:
+                if not de.name.startswith(".") and de.is_dir():
+                    names.add(de.name)
+    for gone in set(_entries) - names:
+        _refresh_locked(gone)
+    for name in names:
+        _refresh_locked(name)
+    _last_rescan = time.monotonic()
+
+
+def version() -> int:
+    with _lock:
+        return _version
+
+
+def query(
+    offset: int = 0,
+    limit: Optional[int] = None,
+    sort: str = "updated_at",
+    order: str = "desc",
+    q: Optional[str] = None,
+    has_final: Optional[bool] = None,
+) -> Tuple[List[dict], int, int]:
+    """
+    Returns (page of summaries, total matching, catalog version the page was
+    read at). `q` matches name, title and style case-insensitively.
+    """
+    with _lock:
+        if time.monotonic() - _last_rescan >= CATALOG_RESCAN_SEC:
+            _rescan_locked()
+        items = list(_entries.values())
+        current = _version
+
+    if q:
+        needle = q.strip().lower()
+        items = [
+            e for e in items
+            if needle in e["name"].lower() or needle in e["title"].lower() or needle in e["style"].lower()
+        ]
+    if has_final is not None:
+        items = [e for e in items if e["has_final"] == has_final]
+
+    key = sort if sort in SORT_KEYS else "updated_at"
+    items.sort(key=lambda e: (e[key], e["name"]), reverse=(order == "desc"))
+
+    total = len(items)
+    page = items[offset:] if limit is None else items[offset:offset + limit]
+    return page, total, current
@@ -0,0 +1,132 @@
+# api/services/clip_cache.py
+"""
+Content-addressed cache of source clips downloaded from Pexels.
+
+Files live under CLIP_CACHE_DIR, keyed by Pexels video id + file variant,
+so the same stock clip is downloaded once no matter how many blocks or
+projects use it. The cache is bounded by CLIP_CACHE_MAX_BYTES and evicts
+least-recently-used files (a file's mtime is its last-use time, so the
+order survives restarts). Concurrent requests for the same key share one
+download.
+"""
+import os
+import re
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict
+
+from api.config import CLIP_CACHE_DIR, CLIP_CACHE_MAX_BYTES
+from .downloader import stream_download
+
+_SAFE_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+_inflight: Dict[str, asyncio.Future] = {}
+_pins: Dict[str, int] = {}
+_stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "errors": 0}
+
+
+def clip_key(video: dict) -> str:
+    """
+    Cache key for a Pexels search result: "<video id>_<file variant>".
+    """
+    variant = video.get("file_id") or f"{video.get('file_width', 0)}x{video.get('file_height', 0)}"
+    return _SAFE_RE.sub("-", f"{video.get('id')}_{variant}")
+
+
+def _path_for(key: str) -> str:
+    return os.path.join(CLIP_CACHE_DIR, f"{key}.mp4")
+
+
+def _entries():
+    if not os.path.isdir(CLIP_CACHE_DIR):
+        return []
+    entries = []
+    for entry in os.scandir(CLIP_CACHE_DIR):
+        if entry.is_file() and entry.name.endswith(".mp4"):  # skips in-progress .part files
+            st = entry.stat()
+            entries.append((st.st_mtime, st.st_size, entry.name[:-len(".mp4")], entry.path))
+    return entries
+
+
+def _evict(keep: str) -> None:
+    entries = sorted(_entries())
+    total = sum(size for _, size, _, _ in entries)
+    for _, size, key, path in entries:
+        if total <= CLIP_CACHE_MAX_BYTES:
+            break
+        if key == keep or _pins.get(key):
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        _stats["evictions"] += 1
+        print(f"🧹 Evicted cached clip {key}")
+
+
+async def _fetch(key: str, url: str) -> str:
+    path = _path_for(key)
+    if os.path.exists(path):
+        _stats["hits"] += 1
+        os.utime(path)  # bump LRU position
+        return path
+
+    inflight = _inflight.get(key)
+    if inflight is not None:
+        _stats["coalesced"] += 1
+        try:
+            return await asyncio.shield(inflight)
+        except asyncio.CancelledError:
+            if not inflight.cancelled():
+                raise
+            # The task doing the download was cancelled, not us: try again
+            return await _fetch(key, url)
+
+    _stats["misses"] += 1
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        os.makedirs(CLIP_CACHE_DIR, exist_ok=True)
+        await stream_download(url, path)
+        _evict(keep=key)
+        future.set_result(path)
+        return path
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        _stats["errors"] += 1
+        future.set_exception(e)
+        future.exception()  # mark retrieved when nobody else is waiting
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+
+@asynccontextmanager
+async def cached_clip(video: dict):
+    """
+    Yields the local path of the clip's source file, downloading it on a miss.
+    The file is pinned (never evicted) until the block exits.
+    """
+    key = clip_key(video)
+    _pins[key] = _pins.get(key, 0) + 1
+    try:
+        yield await _fetch(key, video["video_url"])
+    finally:
+        _pins[key] -= 1
+        if not _pins[key]:
+            del _pins[key]
+
+
+def cache_stats() -> dict:
+    entries = _entries()
+    lookups = _stats["hits"] + _stats["misses"] + _stats["coalesced"]
+    return {
+        **_stats,
+        "hit_rate": round((_stats["hits"] + _stats["coalesced"]) / lookups, 3) if lookups else 0.0,
+        "entries": len(entries),
+        "bytes": sum(size for _, size, _, _ in entries),
+        "max_bytes": CLIP_CACHE_MAX_BYTES,
+    }
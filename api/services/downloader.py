@@ -0,0 +1,79 @@
+# api/services/downloader.py
+"""
+Chunked streaming downloads straight to disk.
+
+Bytes go to "<dest>.part" as they arrive, so memory stays at one chunk
+regardless of file size. An interrupted transfer is resumed with an HTTP
+Range request, and the final size is checked against Content-Length /
+Content-Range before the file is moved into place.
+"""
+import os
+import re
+from typing import Optional
+
+import httpx
+
+from api.config import DOWNLOAD_CHUNK_SIZE, DOWNLOAD_MAX_ATTEMPTS
+from api.services.http_clients import get_client
+
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class IncompleteDownload(IOError):
+    pass
+
+
+def _expected_size(res: httpx.Response, offset: int) -> Optional[int]:
+    if res.status_code == 206:
+        m = _CONTENT_RANGE_RE.match(res.headers.get("content-range", ""))
+        if m and m.group(3) != "*":
+            return int(m.group(3))
+        length = res.headers.get("content-length")
+        return offset + int(length) if length else None
+    length = res.headers.get("content-length")
+    return int(length) if length else None
+
+
+async def stream_download(url: str, dest: str, chunk_size: int = DOWNLOAD_CHUNK_SIZE) -> int:
+    """
+    Downloads `url` to `dest`, resuming a previous partial file if present.
+    Returns the number of bytes written. Raises IncompleteDownload if the
+    size still doesn't match after DOWNLOAD_MAX_ATTEMPTS tries.
+    """
+    part = f"{dest}.part"
+
+    client = get_client("downloads")
+
+    for attempt in range(1, DOWNLOAD_MAX_ATTEMPTS + 1):
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        try:
+            async with client.stream("GET", url, headers=headers) as res:
+                if res.status_code == 416:
+                    # Our partial file is not a prefix of this resource any more
+                    os.remove(part)
+                    continue
+                res.raise_for_status()
+
+                if offset and res.status_code != 206:
+                    offset = 0  # server ignored the Range header; start over
+                expected = _expected_size(res, offset)
+
+                with open(part, "ab" if offset else "wb") as f:
+                    async for chunk in res.aiter_bytes(chunk_size):
+                        f.write(chunk)
+
+            size = os.path.getsize(part)
+            if expected is not None and size != expected:
+                raise IncompleteDownload(f"Expected {expected} bytes, got {size}")
+
+            os.replace(part, dest)
+            return size
+
+        except (httpx.TransportError, IncompleteDownload) as e:
+            if attempt == DOWNLOAD_MAX_ATTEMPTS:
+                raise
+            print(f"⚠️ Download interrupted ({e}); resuming (attempt {attempt + 1}/{DOWNLOAD_MAX_ATTEMPTS})")
+
+    raise IncompleteDownload(f"Could not download {url}")
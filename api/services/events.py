@@ -0,0 +1,91 @@
+# api/services/events.py
+"""
+Change feed for project and block events, delivered over SSE (/events).
+
+Services call `publish(project, type, **data)` when they write an artifact;
+it is safe to call from worker threads as well as the event loop. Each event
+gets an increasing id, and the last EVENTS_BUFFER events are kept so clients
+reconnecting with Last-Event-ID don't miss anything. Ids restart with the
+process, so the SSE id carries a boot epoch ("<boot>-<n>"); a Last-Event-ID
+from another process replays the whole buffer instead of hiding new events.
+
+Event types: project_created, block_updated, audio_ready, video_ready,
+final_ready.
+"""
+import time
+import asyncio
+import threading
+from collections import deque
+from typing import AsyncIterator, Optional
+
+from api.config import EVENTS_BUFFER
+from api.utils.fs import now_iso
+
+_lock = threading.Lock()
+_BOOT = f"{int(time.time() * 1000):x}"
+_last_id = 0
+_recent: deque = deque(maxlen=EVENTS_BUFFER)
+_subscribers: set = set()  # (loop, queue, project filter)
+
+
+def publish(project: str, event_type: str, **data) -> dict:
+    event = {"type": event_type, "project": project, "at": now_iso(), **data}
+    global _last_id
+    with _lock:
+        _last_id += 1
+        event["id"] = _last_id
+        _recent.append(event)
+        subscribers = list(_subscribers)
+    for loop, queue, wanted in subscribers:
+        if wanted is None or wanted == project:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+            except RuntimeError:
+                pass  # subscriber's loop is closed
+    return event
+
+
+def sse_id(event: dict) -> str:
+    return f"{_BOOT}-{event['id']}"
+
+
+def parse_last_event_id(value: Optional[str]) -> int:
+    """
+    Event counter to resume after, from a Last-Event-ID header. Ids from
+    another process (or otherwise not issued here) resume from the start of
+    the buffer.
+    """
+    boot, _, seq = (value or "").rpartition("-")
+    if boot != _BOOT:
+        return 0
+    try:
+        seq_id = int(seq)
+    except ValueError:
+        return 0
+    with _lock:
+        return seq_id if 0 <= seq_id <= _last_id else 0
+
+
+async def subscribe(project: Optional[str] = None, last_event_id: int = 0) -> AsyncIterator[dict]:
+    """
+    Yields events (optionally only for one project), starting with any buffered
+    events newer than `last_event_id`.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    sub = (asyncio.get_running_loop(), queue, project)
+    with _lock:
+        backlog = [e for e in _recent if e["id"] > last_event_id and (project is None or e["project"] == project)]
+        _subscribers.add(sub)
+    try:
+        seen = last_event_id
+        for event in backlog:
+            seen = event["id"]
+            yield event
+        while True:
+            event = await queue.get()
+            if event["id"] > seen:
+                seen = event["id"]
+                yield event
+    finally:
+        with _lock:
+            _subscribers.discard(sub)
@@ -0,0 +1,131 @@
+# api/services/http_clients.py
+"""
+Application-scoped registry of pooled httpx.AsyncClient instances.
+
+Each outbound service gets one long-lived client (its own keep-alive pool,
+limits and timeouts) instead of a new client and TLS handshake per call.
+Clients are created lazily and closed from the FastAPI lifespan. HTTP/2 is
+enabled when the optional `h2` package is installed.
+"""
+import os
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from api.config import HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_KEEPALIVE_EXPIRY
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_PROFILES = {
+    "pexels": {"timeout": httpx.Timeout(15.0, connect=5.0)},
+    "elevenlabs": {"timeout": httpx.Timeout(60.0, connect=5.0)},
+    "openai": {"timeout": httpx.Timeout(120.0, connect=5.0)},
+    "downloads": {"timeout": httpx.Timeout(60.0, connect=10.0), "follow_redirects": True},
+}
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_metrics: Dict[str, Counter] = {}
+_openai: Optional[Tuple[httpx.AsyncClient, object]] = None
+
+
+class _CountingTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps the pooled transport to count requests, responses and failed sends
+    (connect errors, timeouts, cancellations), which response hooks never see.
+    """
+
+    def __init__(self, name: str, transport: httpx.AsyncHTTPTransport):
+        self.counters = _metrics.setdefault(name, Counter())
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.counters["requests"] += 1
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            self.counters["errors"] += 1
+            raise
+        self.counters["responses"] += 1
+        self.counters[f"status_{response.status_code // 100}xx"] += 1
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def get_client(name: str) -> httpx.AsyncClient:
+    """
+    Returns the shared client for `name` ("pexels", "elevenlabs", "openai", "downloads").
+    """
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        profile = _PROFILES[name]
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+        client = httpx.AsyncClient(
+            transport=_CountingTransport(name, transport),
+            timeout=profile["timeout"],
+            follow_redirects=profile.get("follow_redirects", False),
+        )
+        _clients[name] = client
+    return client
+
+
+def get_openai_client():
+    """
+    AsyncOpenAI client on top of the shared "openai" pool. Rebuilt whenever
+    that pool was closed (e.g. by a previous lifespan) and recreated.
+    Retries are handled by the resilience layer, not the SDK.
+    """
+    global _openai
+    from openai import AsyncOpenAI
+
+    http_client = get_client("openai")
+    if _openai is None or _openai[0] is not http_client:
+        _openai = (http_client, AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client, max_retries=0
+        ))
+    return _openai[1]
+
+
+async def close_clients() -> None:
+    for client in list(_clients.values()):
+        await client.aclose()
+    _clients.clear()
+
+
+def _pool_info(client: httpx.AsyncClient) -> dict:
+    # httpx doesn't expose pool state publicly; read httpcore's pool best-effort
+    transport = getattr(client, "_transport", None)
+    pool = getattr(getattr(transport, "transport", transport), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = sum(1 for c in connections if getattr(c, "is_idle", lambda: False)())
+    return {"connections": len(connections), "idle": idle, "active": len(connections) - idle}
+
+
+def pool_metrics() -> dict:
+    metrics = {}
+    for name in _PROFILES:
+        counters = _metrics.get(name, Counter())
+        client = _clients.get(name)
+        metrics[name] = {
+            "requests": counters["requests"],
+            "responses": counters["responses"],
+            "errors": counters["errors"],
+            **{k: v for k, v in counters.items() if k.startswith("status_")},
+            "in_flight": counters["requests"] - counters["responses"] - counters["errors"],
+            "open": bool(client and not client.is_closed),
+            **(_pool_info(client) if client and not client.is_closed else {}),
+        }
+    return {"http2": HTTP2_AVAILABLE, "clients": metrics}
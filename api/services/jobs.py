@@ -0,0 +1,208 @@
+# api/services/jobs.py
+"""
+In-process background jobs for long-running render endpoints.
+
+A job wraps a coroutine in an asyncio task, tracks per-stage progress and
+mirrors its state to projects/{project}/jobs/{job_id}.json so the status
+survives a server restart. Services report progress through `add_work` /
+`advance`, which find the running job via a context variable and are
+no-ops outside of a job.
+"""
+import os
+import time
+import uuid
+import asyncio
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Dict, Optional
+
+from fastapi import HTTPException
+
+from api.config import PROJECTS_DIR
+from api.utils.fs import now_iso, atomic_write_json
+from api.services.projects import _read_json_safe
+
+STAGES = ["tts", "planning", "search", "rerank", "download", "encode", "stitch", "mux"]
+ACTIVE_STATUSES = ("queued", "running")
+
+_PERSIST_INTERVAL = 1.0  # seconds between progress-only writes
+
+_current_job: ContextVar[Optional["Job"]] = ContextVar("current_job", default=None)
+_jobs: Dict[str, "Job"] = {}
+_tasks: Dict[str, asyncio.Task] = {}
+_job_projects: Dict[str, str] = {}  # job id -> project, so lookups never scan projects
+
+
+def _jobs_dir(project: str) -> str:
+    return os.path.join(PROJECTS_DIR, project, "jobs")
+
+
+def _job_path(project: str, job_id: str) -> str:
+    return os.path.join(_jobs_dir(project), f"{job_id}.json")
+
+
+class Job:
+    def __init__(self, project: str, kind: str, params: dict):
+        self.id = uuid.uuid4().hex
+        self.project = project
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.stages = {stage: {"done": 0, "total": 0} for stage in STAGES}
+        self.result = None
+        self.error = None
+        self.created_at = now_iso()
+        self.updated_at = self.created_at
+        self._last_persist = 0.0
+
+    def to_dict(self) -> dict:
+        stages = {}
+        for stage, counts in self.stages.items():
+            if counts["total"] == 0:
+                state = "pending"
+            elif counts["done"] >= counts["total"]:
+                state = "done"
+            else:
+                state = "running"
+            stages[stage] = {**counts, "status": state}
+        return {
+            "job_id": self.id,
+            "project": self.project,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "stages": stages,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+    def persist(self, force: bool = True) -> None:
+        now = time.monotonic()
+        if not force and now - self._last_persist < _PERSIST_INTERVAL:
+            return
+        self._last_persist = now
+        self.updated_at = now_iso()
+        atomic_write_json(_job_path(self.project, self.id), self.to_dict())
+
+
+def add_work(stage: str, n: int = 1) -> None:
+    """Registers `n` more units of work for `stage` on the current job."""
+    job = _current_job.get()
+    if job is None:
+        return
+    job.stages[stage]["total"] += n
+    job.persist(force=False)
+
+
+def advance(stage: str, n: int = 1) -> None:
+    """Marks `n` units of `stage` as done on the current job."""
+    job = _current_job.get()
+    if job is None:
+        return
+    job.stages[stage]["done"] += n
+    job.persist(force=False)
+
+
+async def _run(job: Job, factory: Callable[[], Awaitable[dict]]) -> None:
+    _current_job.set(job)
+    job.status = "running"
+    job.persist()
+    try:
+        job.result = await factory()
+        job.status = "succeeded"
+    except asyncio.CancelledError:
+        job.status = "cancelled"
+    except HTTPException as e:
+        job.status = "failed"
+        job.error = e.detail
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e) or type(e).__name__
+    finally:
+        job.persist()
+        # Finished jobs are served from their persisted JSON from here on
+        _jobs.pop(job.id, None)
+        _tasks.pop(job.id, None)
+        print(f"🧾 Job {job.id} ({job.kind}) {job.status}")
+
+
+def submit_job(project: str, kind: str, params: dict, factory: Callable[[], Awaitable[dict]]) -> dict:
+    """
+    Starts `factory()` in the background and returns the job's initial state.
+    """
+    job = Job(project, kind, params)
+    job.persist()
+    _jobs[job.id] = job
+    _job_projects[job.id] = project
+    _tasks[job.id] = asyncio.create_task(_run(job, factory))
+    return {**job.to_dict(), "status_url": f"/jobs/{job.id}"}
+
+
+def _load_job(job_id: str) -> Optional[dict]:
+    project = _job_projects.get(job_id)
+    if project is None:
+        return None
+    return _read_job(_job_path(project, job_id))
+
+
+def _read_job(path: str) -> Optional[dict]:
+    return _read_json_safe(path) or None
+
+
+def get_job(job_id: str) -> dict:
+    job = _jobs.get(job_id)
+    data = job.to_dict() if job else _load_job(job_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return data
+
+
+def list_jobs(project: str) -> list:
+    jobs_dir = _jobs_dir(project)
+    if not os.path.isdir(jobs_dir):
+        return []
+    items = []
+    for fname in os.listdir(jobs_dir):
+        if not fname.endswith(".json"):
+            continue
+        job_id = fname[:-len(".json")]
+        job = _jobs.get(job_id)
+        data = job.to_dict() if job else _read_job(os.path.join(jobs_dir, fname))
+        if data:
+            items.append(data)
+    items.sort(key=lambda j: j.get("created_at", ""), reverse=True)
+    return items
+
+
+def cancel_job(job_id: str) -> dict:
+    task = _tasks.get(job_id)
+    if task is None:
+        data = get_job(job_id)
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is not running ({data.get('status')})")
+    task.cancel()
+    return {"job_id": job_id, "status": "cancelling"}
+
+
+def recover_jobs() -> None:
+    """
+    Marks jobs that were queued/running when the server stopped as interrupted,
+    and indexes every persisted job by project for status lookups.
+    """
+    if not os.path.isdir(PROJECTS_DIR):
+        return
+    for name in os.listdir(PROJECTS_DIR):
+        jobs_dir = _jobs_dir(name)
+        if not os.path.isdir(jobs_dir):
+            continue
+        for fname in os.listdir(jobs_dir):
+            if not fname.endswith(".json"):
+                continue
+            _job_projects[fname[:-len(".json")]] = name
+            path = os.path.join(jobs_dir, fname)
+            data = _read_job(path)
+            if data and data.get("status") in ACTIVE_STATUSES and data.get("job_id") not in _tasks:
+                data["status"] = "interrupted"
+                data["error"] = "Server restarted before the job finished"
+                data["updated_at"] = now_iso()
+                atomic_write_json(path, data)
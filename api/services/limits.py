@@ -0,0 +1,32 @@
+# api/services/limits.py
+"""
+Process-wide concurrency limits shared by every render in flight.
+Each stage gets its own semaphore so a burst of downloads can't starve
+the Pexels search or GPT-4o rerank stages (and vice versa).
+Encode slots cap CPU-bound ffmpeg/moviepy/pydub work across all blocks;
+media-io slots cap ffprobe and stream-copy remuxes, which are cheap and must
+not wait behind minutes-long encodes. Both are taken by `media_exec`, never
+directly by services.
+"""
+import asyncio
+
+from api.config import (
+    SCENE_SEARCH_CONCURRENCY,
+    SCENE_RERANK_CONCURRENCY,
+    SCENE_DOWNLOAD_CONCURRENCY,
+    SCENE_PLAN_CONCURRENCY,
+    BLOCK_CONCURRENCY,
+    TTS_CONCURRENCY,
+    MEDIA_WORKERS,
+    MEDIA_IO_CONCURRENCY,
+)
+
+search_slots = asyncio.Semaphore(SCENE_SEARCH_CONCURRENCY)
+rerank_slots = asyncio.Semaphore(SCENE_RERANK_CONCURRENCY)
+download_slots = asyncio.Semaphore(SCENE_DOWNLOAD_CONCURRENCY)
+plan_slots = asyncio.Semaphore(SCENE_PLAN_CONCURRENCY)
+
+block_slots = asyncio.Semaphore(BLOCK_CONCURRENCY)
+tts_slots = asyncio.Semaphore(TTS_CONCURRENCY)
+encode_slots = asyncio.Semaphore(MEDIA_WORKERS)
+media_io_slots = asyncio.Semaphore(MEDIA_IO_CONCURRENCY)
@@ -0,0 +1,44 @@
+# api/services/llm_cache.py
+"""
+Persistent cache for LLM responses (scene plans, rerank decisions).
+
+Keys hash the model, the full prompt and any extra inputs (e.g. the
+ordered thumbnail URLs), so a re-render with unchanged inputs skips the
+GPT-4o call entirely. Entries expire after LLM_CACHE_TTL and the store is
+capped at LLM_CACHE_MAX_ENTRIES. Set LLM_CACHE_ENABLED=0, or pass
+use_cache=False, to bypass it.
+"""
+from typing import Any, Optional
+
+from api.config import LLM_CACHE_ENABLED, LLM_CACHE_DIR, LLM_CACHE_TTL, LLM_CACHE_MAX_ENTRIES
+from api.utils.disk_cache import DiskCache, hash_key
+
+_store = DiskCache(LLM_CACHE_DIR, max_entries=LLM_CACHE_MAX_ENTRIES)
+_stats = {"hits": 0, "misses": 0, "bypassed": 0}
+
+
+def llm_cache_key(kind: str, model: str, prompt: Any, **inputs) -> str:
+    return hash_key("llm", kind, model, prompt, inputs)
+
+
+def get_cached(key: str, use_cache: bool = True) -> Optional[Any]:
+    """Returns the cached value, or None on a miss / when bypassed."""
+    if not (use_cache and LLM_CACHE_ENABLED):
+        _stats["bypassed"] += 1
+        return None
+    entry = _store.get(key)
+    if entry is None:
+        _stats["misses"] += 1
+        return None
+    _stats["hits"] += 1
+    return entry["value"]
+
+
+def set_cached(key: str, value: Any, ttl: float = LLM_CACHE_TTL) -> None:
+    # A bypassed call still refreshes the entry so the next cached run sees the new answer
+    if LLM_CACHE_ENABLED:
+        _store.set(key, value, ttl=ttl)
+
+
+def cache_stats() -> dict:
+    return {**_stats, "entries": _store.count(), "max_entries": LLM_CACHE_MAX_ENTRIES}
@@ -0,0 +1,95 @@
+# api/services/media_exec.py
+"""
+Media execution layer: runs ffmpeg as real async subprocesses and
+CPU-heavy Python media work (moviepy, pydub) in a bounded process pool,
+so renders never block the event loop.
+
+Both paths share `limits.encode_slots`, sized by MEDIA_WORKERS. ffprobe and
+stream-copy remuxes go through `run_remux`/`run_ffprobe` instead, which hold
+the separate `limits.media_io_slots`.
+"""
+import json
+import asyncio
+import functools
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from api.config import MEDIA_WORKERS
+from . import limits
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=MEDIA_WORKERS)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def _run(cmd: List[str], check: bool, slots: asyncio.Semaphore) -> subprocess.CompletedProcess:
+    async with slots:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await proc.communicate()
+        except asyncio.CancelledError:
+            proc.kill()
+            await proc.wait()
+            raise
+
+    stderr_text = stderr.decode(errors="replace")
+    if check and proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, output=stdout, stderr=stderr_text)
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout=stdout, stderr=stderr_text)
+
+
+async def run_ffmpeg(cmd: List[str], check: bool = True) -> subprocess.CompletedProcess:
+    """
+    Async replacement for subprocess.run(cmd). Raises CalledProcessError
+    (with decoded stderr) on a non-zero exit when `check` is set.
+    The process is killed if the awaiting task is cancelled.
+    """
+    return await _run(cmd, check, limits.encode_slots)
+
+
+async def run_remux(cmd: List[str], check: bool = True) -> subprocess.CompletedProcess:
+    """
+    Like `run_ffmpeg`, for commands that don't encode video (ffprobe,
+    `-c:v copy` cuts, concats and muxes, at most with a light audio encode):
+    held under the media-io limit instead of an encode slot.
+    """
+    return await _run(cmd, check, limits.media_io_slots)
+
+
+async def run_ffprobe(path: str) -> dict:
+    """
+    Returns ffprobe's JSON description (format + streams) of a media file.
+    """
+    result = await run_remux([
+        "ffprobe", "-v", "error",
+        "-print_format", "json",
+        "-show_format", "-show_streams",
+        path
+    ])
+    return json.loads(result.stdout or b"{}")
+
+
+async def run_in_pool(fn, *args, **kwargs):
+    """
+    Runs a picklable, module-level function in the media process pool.
+    """
+    async with limits.encode_slots:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_pool(), functools.partial(fn, *args, **kwargs))
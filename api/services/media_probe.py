@@ -0,0 +1,75 @@
+# api/services/media_probe.py
+"""
+Cached media probing.
+
+One ffprobe call reads the container and stream headers (no decoding); the
+result is cached in-process by (path, mtime, size), so repeated timing and
+format checks on the same file are free until the file changes.
+"""
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from .media_exec import run_ffprobe
+
+_MAX_ENTRIES = 1024
+_cache: "OrderedDict[str, Tuple[int, int, dict]]" = OrderedDict()
+
+
+async def probe(path: str) -> dict:
+    """
+    ffprobe's JSON description (format + streams) of `path`.
+    Raises FileNotFoundError if the file is missing.
+    """
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    cached = _cache.get(key)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        _cache.move_to_end(key)
+        return cached[2]
+
+    info = await run_ffprobe(key)
+    _cache[key] = (st.st_mtime_ns, st.st_size, info)
+    _cache.move_to_end(key)
+    while len(_cache) > _MAX_ENTRIES:
+        _cache.popitem(last=False)
+    return info
+
+
+def first_stream(info: dict, codec_type: str) -> Optional[dict]:
+    for stream in info.get("streams", []):
+        if stream.get("codec_type") == codec_type:
+            return stream
+    return None
+
+
+async def duration(path: str) -> float:
+    """
+    Duration in seconds (float) from the container header, falling back to the
+    longest stream.
+    """
+    info = await probe(path)
+    value = info.get("format", {}).get("duration")
+    if value in (None, "N/A"):
+        streams = [s.get("duration") for s in info.get("streams", [])]
+        value = max((float(d) for d in streams if d not in (None, "N/A")), default=0.0)
+    return float(value)
+
+
+async def audio_info(path: str) -> Optional[dict]:
+    """
+    Duration, codec, sample rate, channels and bitrate of the first audio
+    stream, or None if the file has no audio.
+    """
+    info = await probe(path)
+    stream = first_stream(info, "audio")
+    if stream is None:
+        return None
+    bit_rate = stream.get("bit_rate") or info.get("format", {}).get("bit_rate")
+    return {
+        "duration": await duration(path),
+        "codec": stream.get("codec_name"),
+        "sample_rate": int(stream.get("sample_rate") or 0),
+        "channels": stream.get("channels"),
+        "bit_rate": int(bit_rate) if bit_rate else None,
+    }
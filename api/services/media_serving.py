@@ -0,0 +1,49 @@
+# api/services/media_serving.py
+"""
+Helpers for GET /media/{project}/{path}: safe path resolution, content-hash
+ETags and versioned URLs.
+
+The ETag is the sha256 that build_graph recorded for the output when it was
+rendered (looked up by path, size and mtime in build.json), so it changes
+exactly when the content does and serving never reads the file to compute it.
+Files without a matching record (HLS segments, outputs rewritten since) are
+hashed once in a worker thread and cached by mtime/size. URLs carrying
+`?v=<hash>` are immutable and can be cached forever; a re-render produces a
+new hash and therefore a new URL.
+"""
+import os
+from typing import Optional
+
+from fastapi import HTTPException
+
+from api.config import PROJECTS_DIR
+from . import build_graph
+
+VERSION_LEN = 16
+
+
+def resolve_media_path(project: str, rel_path: str) -> str:
+    """
+    Absolute path of `rel_path` inside the project's media directory.
+    404 for anything outside it or missing.
+    """
+    media_root = os.path.realpath(os.path.join(PROJECTS_DIR, project, "media"))
+    path = os.path.realpath(os.path.join(media_root, rel_path))
+    if not path.startswith(media_root + os.sep) or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Media not found")
+    return path
+
+
+async def content_version(path: str) -> Optional[str]:
+    fingerprint = await build_graph.fingerprint(path)
+    return fingerprint[:VERSION_LEN] if fingerprint else None
+
+
+async def versioned_url(project: str, rel_path: str) -> str:
+    """
+    /media URL for a file under the project's media directory, with `?v=` set
+    to its content hash (omitted if the file doesn't exist yet).
+    """
+    url = f"/media/{project}/{rel_path}"
+    version = await content_version(os.path.join(PROJECTS_DIR, project, "media", rel_path))
+    return f"{url}?v={version}" if version else url
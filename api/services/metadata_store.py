@@ -0,0 +1,132 @@
+# api/services/metadata_store.py
+"""
+Coordinated read-modify-write of a project's JSON metadata
+(script.json, build.json, media/audio/audio.json, media/video/video.json).
+
+Every update of a file runs under a per-file lock in this process and an
+fcntl lock on a sidecar `.lock` file across processes, re-reads the file
+inside the lock, and replaces it atomically. `update_async` additionally
+group-commits: updates to the same file queued within METADATA_BATCH_SEC are
+applied together and written once, off the event loop.
+"""
+import os
+import copy
+import json
+import asyncio
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+from api.config import PROJECTS_DIR, METADATA_BATCH_SEC
+from api.utils.fs import atomic_write_json
+
+_registry_lock = threading.Lock()
+_locks: Dict[str, threading.RLock] = {}
+_pending: Dict[str, List[Tuple[Callable[[dict], Any], asyncio.Future]]] = {}
+
+
+def metadata_path(project: str, name: str) -> str:
+    return os.path.join(PROJECTS_DIR, project, name)
+
+
+def _lock_for(path: str) -> threading.RLock:
+    with _registry_lock:
+        return _locks.setdefault(path, threading.RLock())
+
+
+def _read(path: str) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+@contextmanager
+def locked(project: str, name: str):
+    """
+    Holds the in-process and cross-process lock for one metadata file; yields its path.
+    """
+    path = metadata_path(project, name)
+    with _lock_for(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.lock", "a") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield path
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read(project: str, name: str) -> dict:
+    """
+    Current contents (or {}). Writers replace files atomically, so no lock is needed.
+    """
+    return _read(metadata_path(project, name))
+
+
+def update(project: str, name: str, mutate: Callable[[dict], Any]) -> Any:
+    """
+    Applies `mutate(data)` to the file's contents under the lock and writes the
+    result back if anything changed. Returns whatever `mutate` returned; if it
+    raises, nothing is written.
+    Blocking (thread and file locks): from async code use `update_async`.
+    """
+    with locked(project, name) as path:
+        data = _read(path)
+        original = copy.deepcopy(data)
+        result = mutate(data)
+        if data != original:
+            atomic_write_json(path, data)
+        return result
+
+
+def _apply_batch(project: str, name: str, batch) -> List[Tuple[bool, Any]]:
+    outcomes = []
+    with locked(project, name) as path:
+        data = _read(path)
+        original = copy.deepcopy(data)
+        for mutate, _ in batch:
+            try:
+                outcomes.append((True, mutate(data)))
+            except Exception as e:
+                outcomes.append((False, e))
+        if data != original:
+            atomic_write_json(path, data)
+    return outcomes
+
+
+async def _flush(project: str, name: str, key: str) -> None:
+    await asyncio.sleep(METADATA_BATCH_SEC)
+    batch = _pending.pop(key, [])
+    try:
+        outcomes = await asyncio.to_thread(_apply_batch, project, name, batch)
+    except Exception as e:
+        outcomes = [(False, e)] * len(batch)
+    for (_, future), (ok, value) in zip(batch, outcomes):
+        if future.done():
+            continue
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+
+async def update_async(project: str, name: str, mutate: Callable[[dict], Any]) -> Any:
+    """
+    Like `update`, but concurrent callers share one locked read and one write.
+    """
+    key = metadata_path(project, name)
+    future = asyncio.get_running_loop().create_future()
+    batch = _pending.setdefault(key, [])
+    batch.append((mutate, future))
+    if len(batch) == 1:
+        asyncio.ensure_future(_flush(project, name, key))
+    return await future
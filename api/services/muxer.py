@@ -1,7 +1,17 @@
 import os
-import subprocess
 
-async def mux_audio_and_video(project_name: str) -> str:
+from . import jobs, build_graph, catalog, events
+from .media_exec import run_remux
+from .assembler import all_canonical, concat_copy, FASTSTART_ARGS
+from .packager import package_output
+from .block_stitcher import stitch_block_videos
+from .projects import _read_json_safe
+
+async def mux_audio_and_video(project_name: str, force: bool = False) -> str:
+    """
+    Muxes final_video.mp4 with full_audio.mp3 into media/mux/full_video.mp4.
+    Skipped when neither input changed since the last mux.
+    """
     project_path = os.path.join("projects", project_name)
     video_path = os.path.join(project_path, "media", "video", "final_video.mp4")
     audio_path = os.path.join(project_path, "media", "audio", "full_audio.mp3")
@@ -15,6 +25,11 @@ async def mux_audio_and_video(project_name: str) -> str:
 
     output_path = os.path.join(mux_dir, "full_video.mp4")
 
+    inputs = await build_graph.files_inputs([video_path, audio_path])
+    if not force and await build_graph.is_fresh(project_name, "mux", inputs, output_path):
+        print("✅ Muxed video is up to date, skipping")
+        return output_path
+
     cmd = [
         "ffmpeg", "-y",
         "-i", video_path,
@@ -22,9 +37,64 @@ async def mux_audio_and_video(project_name: str) -> str:
         "-c:v", "copy",       # Copy video without re-encoding
         "-c:a", "aac",        # Encode audio to AAC (widely supported)
         "-shortest",          # Stop at shortest stream
+        *FASTSTART_ARGS,      # moov atom up front for instant playback
         output_path
     ]
 
     print(f"🎧 Muxing video + audio to {output_path}")
-    subprocess.run(cmd, check=True)
-    return output_path
\ No newline at end of file
+    jobs.add_work("mux")
+    await run_remux(cmd)
+    jobs.advance("mux")
+
+    await build_graph.record(project_name, "mux", inputs, output_path)
+    await package_output(project_name, output_path, force=force)
+    events.publish(project_name, "final_ready", artifact="mux", url=f"/static/{project_name}/media/mux/full_video.mp4")
+    catalog.refresh(project_name)
+    return output_path
+
+
+async def assemble_reel(project_name: str, force: bool = False) -> dict:
+    """
+    Fast assembly: joins the script's block videos and muxes full_audio.mp3 into
+    media/mux/full_video.mp4 in a single stream-copy ffmpeg pass. Falls back to
+    stitch (re-encode) + mux when any block isn't in the canonical profile.
+    """
+    project_path = os.path.join("projects", project_name)
+    video_dir = os.path.join(project_path, "media", "video")
+    audio_path = os.path.join(project_path, "media", "audio", "full_audio.mp3")
+    output_path = os.path.join(project_path, "media", "mux", "full_video.mp4")
+
+    blocks = _read_json_safe(os.path.join(project_path, "script.json")).get("blocks", [])
+    block_paths = [os.path.join(video_dir, f"block_{i}.mp4") for i in range(len(blocks))]
+    missing = [p for p in block_paths if not os.path.exists(p)]
+    if not block_paths or missing:
+        raise FileNotFoundError(f"Block videos missing: {', '.join(os.path.basename(p) for p in missing) or 'none rendered'}")
+    if not os.path.exists(audio_path):
+        raise FileNotFoundError(f"Audio not found: {audio_path}")
+
+    inputs = await build_graph.files_inputs(block_paths + [audio_path])
+    if not force and await build_graph.is_fresh(project_name, "reel", inputs, output_path):
+        print("✅ Reel is up to date, skipping assembly")
+        return {"output_path": output_path, "mode": "cached"}
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if await all_canonical(block_paths):
+        await concat_copy(block_paths, output_path, audio_path=audio_path)
+        mode = "stream_copy"
+    else:
+        print("ℹ️ Blocks are not in the canonical profile, falling back to stitch + mux")
+        await stitch_block_videos(
+            project_name,
+            output_path=os.path.join(video_dir, "final_video.mp4"),
+            block_paths=block_paths,
+            force=force
+        )
+        await mux_audio_and_video(project_name, force=force)
+        mode = "transcode"
+
+    await build_graph.record(project_name, "reel", inputs, output_path)
+    if mode == "stream_copy":  # the transcode path already packaged via mux_audio_and_video
+        await package_output(project_name, output_path, force=force)
+    events.publish(project_name, "final_ready", artifact="reel", url=f"/static/{project_name}/media/mux/full_video.mp4")
+    catalog.refresh(project_name)
+    return {"output_path": output_path, "mode": mode}
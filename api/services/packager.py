@@ -0,0 +1,97 @@
+# api/services/packager.py
+"""
+Output packaging for finished videos.
+
+Every final output is already written with `+faststart` (see
+assembler.FASTSTART_ARGS). On top of that, and only when enabled in config:
+  - a low-bitrate preview MP4 next to the output ({name}_preview.mp4),
+  - HLS with fMP4 segments in hls/{name}/index.m3u8 (stream copy, so the
+    segments follow the source keyframes; canonical blocks have a 2 s GOP).
+Derived files are tracked in the build graph and skipped when the output is
+unchanged. Packaging failures are logged and never fail the render.
+"""
+import os
+import shutil
+import subprocess
+from typing import Dict
+
+from api.config import (
+    PROJECTS_DIR, PREVIEW_RENDITION, PREVIEW_HEIGHT, PREVIEW_VIDEO_BITRATE,
+    HLS_PACKAGING, HLS_SEGMENT_SEC,
+)
+from . import build_graph
+from .media_exec import run_ffmpeg, run_remux
+
+
+def packaged_paths(output_path: str) -> Dict[str, str]:
+    """
+    Where the preview rendition and HLS playlist for `output_path` live.
+    """
+    directory, filename = os.path.split(output_path)
+    stem = os.path.splitext(filename)[0]
+    return {
+        "preview": os.path.join(directory, f"{stem}_preview.mp4"),
+        "hls": os.path.join(directory, "hls", stem, "index.m3u8"),
+    }
+
+
+async def _write_preview(source: str, dest: str) -> None:
+    await run_ffmpeg([
+        "ffmpeg", "-y", "-i", source,
+        "-map", "0:v:0", "-map", "0:a?",
+        "-vf", f"scale=-2:{PREVIEW_HEIGHT}",
+        "-c:v", "libx264", "-preset", "veryfast",
+        "-b:v", PREVIEW_VIDEO_BITRATE, "-maxrate", PREVIEW_VIDEO_BITRATE, "-bufsize", PREVIEW_VIDEO_BITRATE,
+        "-c:a", "aac", "-b:a", "64k",
+        "-movflags", "+faststart",
+        dest
+    ])
+
+
+async def _write_hls(source: str, playlist: str) -> None:
+    hls_dir = os.path.dirname(playlist)
+    shutil.rmtree(hls_dir, ignore_errors=True)  # drop segments of the previous render
+    os.makedirs(hls_dir, exist_ok=True)
+    await run_remux([
+        "ffmpeg", "-y", "-i", source,
+        "-map", "0:v:0", "-map", "0:a?",
+        "-c", "copy",
+        "-f", "hls",
+        "-hls_time", str(HLS_SEGMENT_SEC),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_type", "fmp4",
+        "-hls_fmp4_init_filename", "init.mp4",
+        "-hls_segment_filename", os.path.join(hls_dir, "seg_%03d.m4s"),
+        playlist
+    ])
+
+
+async def package_output(project_name: str, output_path: str, force: bool = False) -> Dict[str, str]:
+    """
+    Writes the enabled extra renditions of `output_path`; returns {kind: path}
+    for those that are available.
+    """
+    paths = packaged_paths(output_path)
+    media_dir = os.path.join(PROJECTS_DIR, project_name, "media")
+    name = os.path.relpath(output_path, media_dir)
+
+    steps = []
+    if PREVIEW_RENDITION:
+        steps.append(("preview", _write_preview, {"height": PREVIEW_HEIGHT, "bitrate": PREVIEW_VIDEO_BITRATE}))
+    if HLS_PACKAGING:
+        steps.append(("hls", _write_hls, {"segment_sec": HLS_SEGMENT_SEC}))
+
+    done = {}
+    for kind, write, settings in steps:
+        artifact = f"{kind}/{name}"
+        inputs = {**(await build_graph.files_inputs([output_path])), **settings}
+        if force or not await build_graph.is_fresh(project_name, artifact, inputs, paths[kind]):
+            print(f"📦 Packaging {kind} for {name}")
+            try:
+                await write(output_path, paths[kind])
+            except subprocess.CalledProcessError as e:
+                print(f"⚠️ {kind} packaging failed for {name}: {e.stderr[-500:]}")
+                continue
+            await build_graph.record(project_name, artifact, inputs, paths[kind])
+        done[kind] = paths[kind]
+    return done
@@ -1,6 +1,10 @@
 # api/services/pexels.py
 import os
-import httpx
+
+from api.config import PEXELS_TARGET_WIDTH, PEXELS_TARGET_HEIGHT, PEXELS_TARGET_FPS
+from api.services.search_cache import cached_search
+from api.services.http_clients import get_client
+from api.services.resilience import call
 
 PEXELS_API_KEY = os.getenv("PEXELS_API_KEY")
 PEXELS_BASE_URL = "https://api.pexels.com/videos/search"
@@ -9,48 +13,101 @@ HEADERS = {
     "Authorization": PEXELS_API_KEY
 }
 
+# Containers the trim step can stream-copy into .mp4 without re-encoding
+STREAM_COPY_TYPES = {"video/mp4"}
+FPS_TOLERANCE = 0.5  # treat 29.97 as 30
+
+
+def select_rendition(
+    video_files: list,
+    target_width: int = PEXELS_TARGET_WIDTH,
+    target_height: int = PEXELS_TARGET_HEIGHT,
+    target_fps: float = PEXELS_TARGET_FPS,
+) -> dict:
+    """
+    Picks the smallest rendition whose short side and fps reach the target,
+    preferring stream-copyable files. Falls back to the largest rendition
+    when none is big enough. Returns {} if there is nothing downloadable.
+    """
+    files = [f for f in video_files if f.get("link") and f.get("width") and f.get("height")]
+    if not files:
+        return {}
+
+    target_short = min(target_width, target_height)
+
+    def pixels(f):
+        return f["width"] * f["height"]
+
+    def copyable(f):
+        return f.get("file_type") in STREAM_COPY_TYPES
+
+    def fps_ok(f):
+        return f.get("fps") is None or f["fps"] >= target_fps - FPS_TOLERANCE
+
+    big_enough = [f for f in files if min(f["width"], f["height"]) >= target_short]
+    if not big_enough:
+        return max(files, key=lambda f: (copyable(f), pixels(f)))
+
+    pool = [f for f in big_enough if fps_ok(f)] or big_enough
+    return min(pool, key=lambda f: (not copyable(f), pixels(f), f.get("size") or 0))
+
+
 async def search_pexels_videos(query: str, per_page: int = 10):
     """
-    Search Pexels for videos matching a query.
+    Search Pexels for videos matching a query, through the search-result cache.
     Returns a list of vertical-format videos with metadata.
     """
+    results = await cached_search(query, per_page, lambda: _search_pexels_uncached(query, per_page))
+    # Cached entries may come from a differently-cased query; keep ours
+    return [{**video, "description": query} for video in results]
+
+
+async def _get_json(params: dict) -> dict:
+    res = await get_client("pexels").get(PEXELS_BASE_URL, headers=HEADERS, params=params)
+    res.raise_for_status()
+    return res.json()
+
+
+async def _search_pexels_uncached(query: str, per_page: int = 10):
     params = {
         "query": query,
         "per_page": per_page
     }
 
-    async with httpx.AsyncClient() as client:
-        try:
-            res = await client.get(PEXELS_BASE_URL, headers=HEADERS, params=params)
-            res.raise_for_status()
-            data = res.json()
-
-            vertical_videos = []
-            for video in data.get("videos", []):
-                width = video.get("width", 0)
-                height = video.get("height", 0)
-                if height <= width:
-                    continue  # skip horizontal or square
-
-                best_file = sorted(video.get("video_files", []), key=lambda f: f.get("width", 0))[-1]
-
-                vertical_videos.append({
-                    "id": video.get("id"),
-                    "description": query,
-                    "url": video.get("url"),
-                    "duration": video.get("duration"),
-                    "thumbnail": video.get("image"),
-                    "video_url": best_file.get("link"),
-                    "user": {
-                        "name": video.get("user", {}).get("name"),
-                        "url": video.get("user", {}).get("url")
-                    },
-                    "width": width,
-                    "height": height
-                })
-
-            return vertical_videos
-
-        except Exception as e:
-            print("❌ Pexels API error:", e)
-            return []
\ No newline at end of file
+    # Rate limits, 5xx and timeouts are retried by the resilience layer; if Pexels
+    # is still failing the error propagates instead of yielding an empty scene.
+    data = await call("pexels", _get_json, params)
+
+    vertical_videos = []
+    for video in data.get("videos", []):
+        width = video.get("width", 0)
+        height = video.get("height", 0)
+        if height <= width:
+            continue  # skip horizontal or square
+
+        best_file = select_rendition(video.get("video_files", []))
+        if not best_file:
+            continue
+
+        vertical_videos.append({
+            "id": video.get("id"),
+            "description": query,
+            "url": video.get("url"),
+            "duration": video.get("duration"),
+            "thumbnail": video.get("image"),
+            "tags": video.get("tags") or [],
+            "video_url": best_file.get("link"),
+            "file_id": best_file.get("id"),
+            "file_width": best_file.get("width"),
+            "file_height": best_file.get("height"),
+            "file_fps": best_file.get("fps"),
+            "file_type": best_file.get("file_type"),
+            "user": {
+                "name": video.get("user", {}).get("name"),
+                "url": video.get("user", {}).get("url")
+            },
+            "width": width,
+            "height": height
+        })
+
+    return vertical_videos
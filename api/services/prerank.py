@@ -0,0 +1,125 @@
+# api/services/prerank.py
+"""
+Local, CPU-only first-stage ranker for Pexels candidates.
+
+Scores each candidate from metadata alone (no network):
+- text similarity between the scene description (plus a little of the
+  narration block) and the clip's title slug and tags, TF-IDF weighted
+  over the candidate set,
+- how close the clip's aspect ratio is to 9:16,
+- whether the clip is long enough for the scene,
+- Pexels' own relevance order, as a weak prior.
+
+The scene pipeline keeps only the top-k for the GPT-4o vision rerank, and
+skips the vision call when the top candidate leads by PRERANK_MARGIN.
+"""
+import re
+import math
+from collections import Counter
+from typing import List, Tuple
+
+from api.config import PRERANK_TOP_K, PRERANK_MARGIN
+
+TARGET_ASPECT = 9 / 16
+
+WEIGHTS = {"text": 0.6, "aspect": 0.15, "duration": 0.15, "rank": 0.1}
+BLOCK_TEXT_WEIGHT = 0.3  # narration words count less than the scene description
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_SLUG_RE = re.compile(r"/video/([^/]+?)(?:-\d+)?/?$")
+_STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "in", "on", "at", "to", "for", "with", "by", "from",
+    "is", "are", "was", "be", "it", "its", "this", "that", "as", "into", "over", "while", "video",
+}
+
+
+def _stem(token: str) -> str:
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(token) > len(suffix) + 2 and token.endswith(suffix):
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(t) for t in _TOKEN_RE.findall((text or "").lower()) if t not in _STOPWORDS]
+
+
+def candidate_text(candidate: dict) -> str:
+    """Title words from the Pexels page slug plus any tags."""
+    match = _SLUG_RE.search(candidate.get("url") or "")
+    slug = match.group(1).replace("-", " ") if match else ""
+    return " ".join([slug, *candidate.get("tags", [])])
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    dot = sum(a[t] * b[t] for t in a if t in b)
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def _text_scores(candidates: List[dict], scene_description: str, block_text: str) -> List[float]:
+    docs = [Counter(tokenize(candidate_text(c))) for c in candidates]
+    n = len(docs)
+    df = Counter(t for doc in docs for t in doc)
+    idf = {t: math.log((n + 1) / (df[t] + 1)) + 1.0 for t in df}
+
+    query = Counter()
+    for t in tokenize(scene_description):
+        query[t] += 1.0
+    for t in tokenize(block_text):
+        query[t] += BLOCK_TEXT_WEIGHT
+
+    weighted_query = Counter({t: w * idf.get(t, 1.0) for t, w in query.items()})
+    return [_cosine(weighted_query, Counter({t: c * idf[t] for t, c in doc.items()})) for doc in docs]
+
+
+def _aspect_score(candidate: dict) -> float:
+    width, height = candidate.get("width") or 0, candidate.get("height") or 0
+    if not width or not height:
+        return 0.0
+    return max(0.0, 1.0 - abs(width / height - TARGET_ASPECT) / TARGET_ASPECT)
+
+
+def _duration_score(candidate: dict, target_sec: float) -> float:
+    duration = candidate.get("duration") or 0
+    if not target_sec:
+        return 1.0
+    return min(1.0, duration / target_sec)
+
+
+def prerank(
+    candidates: List[dict],
+    scene_description: str,
+    block_text: str = "",
+    target_sec: float = 0,
+) -> List[Tuple[int, float]]:
+    """
+    Returns [(candidate index, score)] sorted best-first. Scores are in [0, 1].
+    """
+    if not candidates:
+        return []
+    text = _text_scores(candidates, scene_description, block_text)
+    n = len(candidates)
+    scored = []
+    for i, c in enumerate(candidates):
+        score = (
+            WEIGHTS["text"] * text[i]
+            + WEIGHTS["aspect"] * _aspect_score(c)
+            + WEIGHTS["duration"] * _duration_score(c, target_sec)
+            + WEIGHTS["rank"] * (1.0 - i / n)
+        )
+        scored.append((i, round(score, 4)))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored
+
+
+def shortlist(ranked: List[Tuple[int, float]], top_k: int = PRERANK_TOP_K, margin: float = PRERANK_MARGIN):
+    """
+    Returns (indices to send to the vision rerank, decided index or None).
+    A decided index means the vision call can be skipped.
+    """
+    if not ranked:
+        return [], None
+    if len(ranked) == 1 or ranked[0][1] - ranked[1][1] >= margin:
+        return [ranked[0][0]], ranked[0][0]
+    return [i for i, _ in ranked[:top_k]], None
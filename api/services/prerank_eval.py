@@ -0,0 +1,134 @@
+# api/services/prerank_eval.py
+"""
+Offline evaluation of the local pre-rank against the current GPT-4o behaviour.
+
+Collect cases by rendering with PRERANK_ENABLED=0 and PRERANK_LOG_PATH set:
+every scene then logs its candidates and the vision model's pick over the
+full list. Then run:
+
+    python -m api.services.prerank_eval cases.jsonl [--top-k 4] [--margin 0.25]
+
+With --live, cases without a recorded pick are labelled by calling the
+vision rerank (through the LLM cache) on the full candidate list.
+"""
+import sys
+import json
+import asyncio
+import argparse
+from typing import List, Optional
+
+from api.config import PRERANK_LOG_PATH, PRERANK_TOP_K, PRERANK_MARGIN
+from api.utils.fs import now_iso
+from .prerank import prerank, shortlist
+
+
+def log_decision(
+    scene_description: str,
+    block_text: str,
+    target_sec: float,
+    candidates: List[dict],
+    ranked: list,
+    chosen_index: int,
+    vision: bool,
+) -> None:
+    """Appends one scene decision to PRERANK_LOG_PATH (no-op when unset)."""
+    if not PRERANK_LOG_PATH:
+        return
+    record = {
+        "logged_at": now_iso(),
+        "scene_description": scene_description,
+        "block_text": block_text,
+        "target_sec": target_sec,
+        "candidates": [
+            {k: c.get(k) for k in ("id", "url", "tags", "thumbnail", "duration", "width", "height")}
+            for c in candidates
+        ],
+        "prerank": ranked,
+        "chosen_index": chosen_index,
+        # Only picks made by the vision model over the *full* list are ground truth
+        "baseline": vision and not ranked,
+    }
+    with open(PRERANK_LOG_PATH, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_cases(path: str) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def _label_live(case: dict) -> Optional[int]:
+    from .video_reranker import rerank_with_gpt4v
+    pick = await rerank_with_gpt4v(
+        scene_description=case["scene_description"],
+        thumbnail_urls=[c["thumbnail"] for c in case["candidates"]],
+        block_text=case.get("block_text", ""),
+    )
+    return pick if 0 <= pick < len(case["candidates"]) else 0
+
+
+def evaluate(cases: List[dict], top_k: int = PRERANK_TOP_K, margin: float = PRERANK_MARGIN) -> dict:
+    """
+    Compares the pre-rank with each case's baseline pick. Reports:
+    - top1: pre-rank's first choice equals the baseline,
+    - recall_at_k: baseline survives the shortlist sent to vision,
+    - skip_rate / skip_accuracy: how often vision is skipped, and how often that is right,
+    - thumbnails_saved: share of thumbnails no longer sent to GPT-4o.
+    """
+    n = top1 = recall = skipped = skipped_right = sent = total_thumbs = 0
+    for case in cases:
+        truth = case.get("baseline_index")
+        if truth is None or len(case["candidates"]) < 2:
+            continue
+        ranked = prerank(case["candidates"], case["scene_description"], case.get("block_text", ""),
+                         case.get("target_sec", 0))
+        indices, decided = shortlist(ranked, top_k=top_k, margin=margin)
+
+        n += 1
+        total_thumbs += len(case["candidates"])
+        top1 += ranked[0][0] == truth
+        recall += truth in indices
+        if decided is not None:
+            skipped += 1
+            skipped_right += decided == truth
+        else:
+            sent += len(indices)
+
+    if not n:
+        return {"cases": 0}
+    return {
+        "cases": n,
+        "top1": round(top1 / n, 3),
+        "recall_at_k": round(recall / n, 3),
+        "skip_rate": round(skipped / n, 3),
+        "skip_accuracy": round(skipped_right / skipped, 3) if skipped else None,
+        "thumbnails_saved": round(1 - sent / total_thumbs, 3),
+        "top_k": top_k,
+        "margin": margin,
+    }
+
+
+async def _prepare(cases: List[dict], live: bool) -> List[dict]:
+    for case in cases:
+        if case.get("baseline"):
+            case["baseline_index"] = case["chosen_index"]
+        elif live and case.get("candidates"):
+            case["baseline_index"] = await _label_live(case)
+    return cases
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate the local pre-rank against GPT-4o picks.")
+    parser.add_argument("cases", help="JSONL file written via PRERANK_LOG_PATH")
+    parser.add_argument("--top-k", type=int, default=PRERANK_TOP_K)
+    parser.add_argument("--margin", type=float, default=PRERANK_MARGIN)
+    parser.add_argument("--live", action="store_true", help="label non-baseline cases with GPT-4o")
+    args = parser.parse_args(argv)
+
+    cases = asyncio.run(_prepare(load_cases(args.cases), args.live))
+    print(json.dumps(evaluate(cases, top_k=args.top_k, margin=args.margin), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,7 @@
 # api/services/projects.py
-import os, re, uuid, json
-from datetime import datetime, timezone
+import os, re, uuid, json, asyncio
 
-from typing import List
+from typing import List, Optional
 from fastapi import HTTPException, status
 
 from api.config import PROJECTS_DIR
@@ -11,6 +10,7 @@ from api.schemas.projects import CreateProjectRequest, BlockOut
 from api.schemas.projects import ProjectSummary, ListProjectsResponse
 from api.utils.llm_blocks import generate_blocks_from_idea
 from api.schemas.projects import ProjectDetailResponse
+from api.services import build_graph, catalog, events, metadata_store
 
  
 _SENTENCE_SPLIT = re.compile(r"(?<=[\.\!\?])\s+")
@@ -71,6 +71,8 @@ def create_project_service(req: CreateProjectRequest) -> tuple[str, dict, List[B
 
     atomic_write_json(os.path.join(project_root, "project.json"), project_json)
     atomic_write_json(os.path.join(project_root, "script.json"), script_json)
+    catalog.refresh(slug)
+    events.publish(slug, "project_created")
 
     files = {
         "project": f"{project_root}/project.json",
@@ -88,58 +90,27 @@ def _read_json_safe(path: str) -> dict:
     except Exception:
         return {}
 
-def list_projects_service() -> ListProjectsResponse:
-    root = PROJECTS_DIR
-    items: List[ProjectSummary] = []
-
-    if not os.path.isdir(root):
-        # Nothing yet — return empty response with gentle poll hint
-        return ListProjectsResponse(
-            projects=[],
-            empty=True,
-            last_scan=now_iso(),
-            next_poll_ms=8000,
-        )
-
-    for name in sorted(os.listdir(root)):
-        if name.startswith("."):
-            continue
-        pdir = os.path.join(root, name)
-        if not os.path.isdir(pdir):
-            continue
-
-        project_path = os.path.join(pdir, "project.json")
-        script_path  = os.path.join(pdir, "script.json")
-        if not os.path.isfile(project_path) or not os.path.isfile(script_path):
-            # Skip incomplete projects
-            continue
-
-        pj = _read_json_safe(project_path)
-        sj = _read_json_safe(script_path)
-
-        title = pj.get("title", name)
-        style = pj.get("style", "")
-        updated_at = pj.get("updated_at") or pj.get("created_at") or datetime.now(timezone.utc).isoformat()
-        blocks = len(sj.get("blocks", []))
-
-        has_final = os.path.isfile(os.path.join(pdir, "media", "final", "output.mp4"))
-
-        items.append(ProjectSummary(
-            name=name,
-            title=title,
-            style=style,
-            updated_at=updated_at,
-            blocks=blocks,
-            has_final=has_final
-        ))
-
-    items.sort(key=lambda x: x.updated_at, reverse=True)
+def list_projects_service(
+    offset: int = 0,
+    limit: Optional[int] = None,
+    sort: str = "updated_at",
+    order: str = "desc",
+    q: Optional[str] = None,
+    has_final: Optional[bool] = None,
+) -> ListProjectsResponse:
+    page, total, version = catalog.query(offset=offset, limit=limit, sort=sort, order=order, q=q, has_final=has_final)
+    items = [ProjectSummary(**entry) for entry in page]
 
     return ListProjectsResponse(
         projects=items,
-        empty=(len(items) == 0),
+        empty=(total == 0),
         last_scan=now_iso(),
-        next_poll_ms=8000 if len(items) == 0 else 3000,
+        # Nothing yet — gentle poll hint
+        next_poll_ms=8000 if total == 0 else 3000,
+        total=total,
+        offset=offset,
+        limit=limit,
+        version=version,
     )
 
 
@@ -160,24 +131,39 @@ def get_project_detail_service(name: str) -> ProjectDetailResponse:
     return ProjectDetailResponse(blocks=blocks)
 
 
-def update_block_text(project: str, block_id: str, new_text: str):
+async def update_block_text(project: str, block_id: str, new_text: str):
     """
     Updates the `text` of a specific block in the script.json file for a project.
     Accepts block_id like "block_0", "block_1", etc., and maps it to the index.
+    A changed text invalidates the block's audio and video artifacts.
     """
-    project_dir = os.path.join(PROJECTS_DIR, project)
-    script_path = os.path.join(project_dir, "script.json")
+    def _set_text(data: dict) -> bool:
+        blocks = data.get("blocks", [])
+        try:
+            index = int(block_id.replace("block_", ""))
+            changed = blocks[index].get("text") != new_text
+            blocks[index]["text"] = new_text
+        except (IndexError, ValueError):
+            raise HTTPException(status_code=400, detail=f"Invalid block_id: {block_id}")
+        return changed
 
-    data = _read_json_safe(script_path)
-    blocks = data.get("blocks", [])
+    # Unchanged text leaves script.json untouched
+    if not await metadata_store.update_async(project, "script.json", _set_text):
+        return
+
+    await build_graph.invalidate(project, f"audio/{block_id}", f"video/{block_id}")
+    await asyncio.to_thread(catalog.refresh, project)
+    events.publish(project, "block_updated", block_id=block_id)
 
-    try:
-        index = int(block_id.replace("block_", ""))
-        blocks[index]["text"] = new_text
-    except (IndexError, ValueError):
-        raise HTTPException(status_code=400, detail=f"Invalid block_id: {block_id}")
 
-    atomic_write_json(script_path, data)
+_BLOCK_INDEX_RE = re.compile(r"block_(\d+)")
+
+def block_sort_key(name: str) -> int:
+    """
+    Numeric order for "block_N" ids / file names, so block_10 sorts after block_2.
+    """
+    m = _BLOCK_INDEX_RE.search(name)
+    return int(m.group(1)) if m else 1_000_000
 
 
 def get_project_path(project_name: str) -> str:
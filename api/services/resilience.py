@@ -0,0 +1,238 @@
+# api/services/resilience.py
+"""
+Shared resilience layer for outbound provider calls (Pexels, ElevenLabs, OpenAI).
+
+Every call goes through:
+1. a per-provider circuit breaker (fail fast while a provider is down),
+2. a per-provider token bucket (stay under the provider's rate limit),
+3. retries with jittered exponential backoff that honour Retry-After.
+
+Use `call(provider, fn, ...)` from async code and `call_sync(...)` from
+sync code (e.g. handlers running in the threadpool).
+"""
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httpx
+import openai
+
+from api.config import (
+    PEXELS_RATE_PER_MIN, PEXELS_BURST,
+    ELEVENLABS_RATE_PER_MIN, ELEVENLABS_BURST,
+    OPENAI_RATE_PER_MIN, OPENAI_BURST,
+    RETRY_MAX_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY,
+    BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SEC,
+)
+
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} is temporarily unavailable (circuit open, retry in {retry_in:.0f}s)")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """
+    Classic token bucket. `reserve()` takes a token (possibly going into debt)
+    and returns how long the caller must wait before using it.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int):
+        self.rate = rate_per_sec
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures; after `reset_sec` lets one
+    trial call through (half-open) and closes again if it succeeds.
+    """
+
+    def __init__(self, provider: str, threshold: int, reset_sec: float):
+        self.provider = provider
+        self.threshold = threshold
+        self.reset_sec = reset_sec
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_sec:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+            retry_in = max(0.0, self.reset_sec - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(self.provider, retry_in)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def release_trial(self) -> None:
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.threshold:
+                if self.opened_at is None or self.trial_in_flight:
+                    print(f"🚧 Circuit opened for {self.provider} after {self.failures} failure(s)")
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+
+class Provider:
+    def __init__(self, name: str, rate_per_min: float, burst: int):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_min / 60.0, burst)
+        self.breaker = CircuitBreaker(name, BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SEC)
+
+
+PROVIDERS = {
+    "pexels": Provider("pexels", PEXELS_RATE_PER_MIN, PEXELS_BURST),
+    "elevenlabs": Provider("elevenlabs", ELEVENLABS_RATE_PER_MIN, ELEVENLABS_BURST),
+    "openai": Provider("openai", OPENAI_RATE_PER_MIN, OPENAI_BURST),
+}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code
+    return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (httpx.TransportError, openai.APIConnectionError)):
+        return True  # includes timeouts
+    return _status_code(exc) in RETRYABLE_STATUS
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int, exc: BaseException) -> float:
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))  # full jitter
+    retry_after = _retry_after(exc)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, RETRY_MAX_DELAY))
+    return delay
+
+
+def http_status_for(exc: BaseException) -> int:
+    """HTTP status our API should answer with when a provider call finally fails."""
+    if isinstance(exc, CircuitOpenError):
+        return 503
+    if _status_code(exc) == 429:
+        return 429
+    return 502
+
+
+async def call(provider: str, fn, *args, **kwargs):
+    """
+    Awaits fn(*args, **kwargs) under the provider's breaker, rate limit and retry policy.
+    """
+    p = PROVIDERS[provider]
+    for attempt in range(RETRY_MAX_ATTEMPTS):
+        p.breaker.before_call()
+        wait = p.bucket.reserve()
+        try:
+            if wait:
+                await asyncio.sleep(wait)
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:  # also covers the rate-limit wait
+            p.breaker.release_trial()
+            raise
+        except Exception as e:
+            if not is_retryable(e):
+                p.breaker.record_success()  # the provider answered; the request was bad
+                raise
+            p.breaker.record_failure()
+            if attempt == RETRY_MAX_ATTEMPTS - 1:
+                raise
+            delay = _backoff(attempt, e)
+            print(f"🔁 {provider} call failed ({e}); retry {attempt + 1}/{RETRY_MAX_ATTEMPTS - 1} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        else:
+            p.breaker.record_success()
+            return result
+
+
+def call_sync(provider: str, fn, *args, **kwargs):
+    """
+    Blocking counterpart of `call` for sync code paths.
+    """
+    p = PROVIDERS[provider]
+    for attempt in range(RETRY_MAX_ATTEMPTS):
+        p.breaker.before_call()
+        wait = p.bucket.reserve()
+        if wait:
+            time.sleep(wait)
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if not is_retryable(e):
+                p.breaker.record_success()
+                raise
+            p.breaker.record_failure()
+            if attempt == RETRY_MAX_ATTEMPTS - 1:
+                raise
+            delay = _backoff(attempt, e)
+            print(f"🔁 {provider} call failed ({e}); retry {attempt + 1}/{RETRY_MAX_ATTEMPTS - 1} in {delay:.1f}s")
+            time.sleep(delay)
+        else:
+            p.breaker.record_success()
+            return result
+
+
+def provider_status() -> dict:
+    return {
+        name: {"circuit": p.breaker.state, "failures": p.breaker.failures, "tokens": round(p.bucket.tokens, 2)}
+        for name, p in PROVIDERS.items()
+    }
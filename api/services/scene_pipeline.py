@@ -0,0 +1,115 @@
+# api/services/scene_pipeline.py
+import os
+import asyncio
+from typing import List
+
+from api.config import PRERANK_ENABLED
+from . import jobs, limits
+from .pexels import search_pexels_videos
+from .video_reranker import rerank_with_gpt4v
+from .video_stitcher import download_and_trim
+from .prerank import prerank, shortlist
+from .prerank_eval import log_decision
+
+
+async def _choose_candidate(
+    candidates: List[dict],
+    description: str,
+    duration: float,
+    block_text: str,
+    user_prompt: str,
+    use_llm_cache: bool
+) -> int:
+    """
+    Pre-ranks candidates locally, then asks GPT-4o to pick among the top-k
+    (unless the pre-rank is already decisive). Returns an index into `candidates`.
+    """
+    if PRERANK_ENABLED:
+        ranked = prerank(candidates, description, block_text, duration)
+        indices, decided = shortlist(ranked)
+    else:
+        ranked, indices, decided = [], list(range(len(candidates))), None
+
+    choice = decided
+    if choice is None:
+        async with limits.rerank_slots:
+            try:
+                pick = await rerank_with_gpt4v(
+                    scene_description=description,
+                    thumbnail_urls=[candidates[i]["thumbnail"] for i in indices],
+                    block_text=block_text,
+                    user_prompt=user_prompt,
+                    use_cache=use_llm_cache,
+                )
+            except Exception as e:
+                # Retries are exhausted; the best local/Pexels ordering is a reasonable fallback
+                print(f"⚠️ Rerank failed for '{description}', using top pre-ranked result: {e}")
+                pick = 0
+        choice = indices[pick] if 0 <= pick < len(indices) else indices[0]
+    else:
+        print(f"⚡ Pre-rank picked candidate {choice} for '{description}', skipping vision rerank")
+
+    log_decision(description, block_text, duration, candidates, ranked, choice, vision=decided is None)
+    return choice
+
+
+async def _process_scene(scene: dict, block_text: str, user_prompt: str, use_llm_cache: bool) -> dict:
+    """
+    Search -> rerank -> download for a single scene.
+    Each stage waits on its own semaphore so stages of different scenes overlap.
+    """
+    description = scene["description"]
+    duration = scene["target_sec"]
+
+    async with limits.search_slots:
+        candidates = await search_pexels_videos(description)
+    jobs.advance("search")
+
+    selected_video = {}
+    if candidates:
+        best_video = await _choose_candidate(candidates, description, duration, block_text, user_prompt, use_llm_cache)
+        selected_video = candidates[best_video]
+    jobs.advance("rerank")
+
+    trimmed_path, trimmed_sec = None, None
+    if selected_video.get("video_url"):
+        jobs.add_work("download")
+        async with limits.download_slots:
+            trimmed_path, trimmed_sec = await download_and_trim(selected_video, duration)
+        jobs.advance("download")
+
+    return {
+        "description": description,
+        "target_sec": duration,
+        "selected_video": selected_video,
+        "trimmed_path": trimmed_path,
+        "trimmed_sec": trimmed_sec,
+    }
+
+
+async def run_scene_pipeline(
+    scene_plan: List[dict],
+    block_text: str,
+    user_prompt: str = "",
+    use_llm_cache: bool = True
+) -> List[dict]:
+    """
+    Runs every scene of a block concurrently and returns the results in plan order.
+    If any scene fails, the clips already downloaded for the others are removed
+    and the first error is raised.
+    """
+    jobs.add_work("search", len(scene_plan))
+    jobs.add_work("rerank", len(scene_plan))
+    results = await asyncio.gather(
+        *(_process_scene(scene, block_text, user_prompt, use_llm_cache) for scene in scene_plan),
+        return_exceptions=True,
+    )
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        for r in results:
+            if isinstance(r, dict) and r.get("trimmed_path") and os.path.exists(r["trimmed_path"]):
+                os.remove(r["trimmed_path"])
+        raise errors[0]
+
+    return results
@@ -0,0 +1,80 @@
+# api/services/search_cache.py
+"""
+Persistent TTL cache for Pexels search results.
+
+Queries are normalized (case, whitespace, trailing punctuation) before
+hashing, so "City skyline at night." and "city  skyline at night" share
+an entry. Fresh entries are returned directly; stale ones are returned
+immediately while a background refresh runs (stale-while-revalidate).
+Identical in-flight queries share a single upstream request.
+Entries expire once they are past the stale window, and the store is
+capped at SEARCH_CACHE_MAX_ENTRIES.
+"""
+import re
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, List
+
+from api.config import SEARCH_CACHE_DIR, SEARCH_CACHE_TTL, SEARCH_CACHE_STALE_TTL, SEARCH_CACHE_MAX_ENTRIES
+from api.utils.disk_cache import DiskCache, hash_key
+
+_PUNCT_RE = re.compile(r"^[\W_]+|[\W_]+$")
+
+_store = DiskCache(SEARCH_CACHE_DIR, max_entries=SEARCH_CACHE_MAX_ENTRIES)
+_inflight: Dict[str, asyncio.Task] = {}
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0}
+
+
+def normalize_query(query: str) -> str:
+    return _PUNCT_RE.sub("", " ".join(query.lower().split()))
+
+
+async def _fetch_and_store(key: str, fetch: Callable[[], Awaitable[List[dict]]]) -> List[dict]:
+    # Upstream errors raise, so an empty list is a genuine "no results" and is cached too
+    results = await fetch()
+    _store.set(key, results, ttl=SEARCH_CACHE_TTL + SEARCH_CACHE_STALE_TTL)
+    return results
+
+
+def _done(key: str, task: asyncio.Task) -> None:
+    _inflight.pop(key, None)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"❌ Pexels search refresh failed: {task.exception()}")
+
+
+def _coalesced(key: str, fetch) -> asyncio.Task:
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_fetch_and_store(key, fetch))
+        _inflight[key] = task
+        task.add_done_callback(lambda t: _done(key, t))
+    else:
+        _stats["coalesced"] += 1
+    return task
+
+
+async def cached_search(query: str, per_page: int, fetch: Callable[[], Awaitable[List[dict]]]) -> List[dict]:
+    """
+    Returns cached results for (normalized query, per_page), calling `fetch()` on a miss.
+    """
+    key = hash_key("pexels", normalize_query(query), per_page)
+    entry = _store.get(key)
+
+    if entry is not None:
+        age = time.time() - entry.get("stored_at", 0)
+        if age < SEARCH_CACHE_TTL:
+            _stats["hits"] += 1
+            return entry["value"]
+        if age < SEARCH_CACHE_TTL + SEARCH_CACHE_STALE_TTL:
+            _stats["stale_hits"] += 1
+            if key not in _inflight:
+                _stats["refreshes"] += 1
+            _coalesced(key, fetch)
+            return entry["value"]
+
+    _stats["misses"] += 1
+    return await asyncio.shield(_coalesced(key, fetch))
+
+
+def cache_stats() -> dict:
+    return {**_stats, "inflight": len(_inflight), "entries": _store.count(), "max_entries": SEARCH_CACHE_MAX_ENTRIES}
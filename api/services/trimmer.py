@@ -0,0 +1,29 @@
+# api/services/trimmer.py
+"""
+Clip trimming.
+
+Clips are always cut from their first frame, so a stream copy is clean: the
+cut starts on the opening keyframe and only the tail is shortened. The
+trimmer returns the duration actually achieved (packet boundaries rarely
+land exactly on the target) so the renderer can size each slot from what
+is really there instead of guessing.
+"""
+from . import media_probe
+from .media_exec import run_remux
+
+
+async def trim_clip(source: str, output: str, target_sec: float) -> float:
+    """
+    Stream-copies the first `target_sec` seconds of `source` (video only) to
+    `output` and returns the achieved duration in seconds. Sources shorter
+    than the request are copied in full.
+    """
+    await run_remux([
+        "ffmpeg", "-y",
+        "-i", source,
+        "-t", f"{target_sec:.3f}",
+        "-an", "-c:v", "copy",
+        "-avoid_negative_ts", "make_zero",
+        output
+    ])
+    return await media_probe.duration(output)
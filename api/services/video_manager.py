@@ -1,11 +1,11 @@
 # api/services/video_manager.py
 
 import os
-from pydub import AudioSegment
 
+from . import jobs, limits, build_graph, media_probe, events
+from .clip_cache import clip_key
 from .video_planner import plan_visual_scenes
-from .pexels import search_pexels_videos
-from .video_reranker import rerank_with_gpt4v  # ✅ corrected import
+from .scene_pipeline import run_scene_pipeline
 from .video_stitcher import stitch_and_trim_scenes
 
 
@@ -13,61 +13,73 @@ async def generate_block_video(
     project_name: str,
     block_id: str,
     block_text: str,
-    user_prompt: str = ""
+    user_prompt: str = "",
+    use_llm_cache: bool = True
 ):
     """
     Full pipeline to generate a trimmed + stitched video for a given narration block.
     Returns the final video file path.
+    With use_llm_cache=False, scene plans and reranks are recomputed.
     """
 
+    # Inputs are captured up front so the record matches what this render used
+    artifact = f"video/{block_id}"
+    inputs = await build_graph.block_video_inputs(project_name, block_id, block_text, user_prompt)
+
     # Step 0: Determine duration from audio file
     audio_path = os.path.join("projects", project_name, "media", "audio", f"{block_id}.mp3")
     try:
-        audio = AudioSegment.from_file(audio_path)
-        target_sec = int(audio.duration_seconds)
+        target_sec = await media_probe.duration(audio_path)
     except Exception as e:
-        print(f"❌ Failed to load audio for duration fallback to 8s: {e}")
-        target_sec = 8
+        print(f"❌ Failed to probe audio for duration fallback to 8s: {e}")
+        target_sec = 8.0
 
     # Step 1: Plan scenes from narration
-    scene_plan = await plan_visual_scenes(
-        block_text=block_text,
-        total_target_sec=target_sec,
-        user_prompt=user_prompt
-    )
-
-    final_results = []
-
-    # Step 2: For each scene, get best-matching video
-    for scene in scene_plan:
-        description = scene["description"]
-        duration = scene["target_sec"]
-
-        # Search Pexels videos
-        candidates = await search_pexels_videos(description)
-
-        # Rerank using GPT-4V
-        best_video = await rerank_with_gpt4v(  # ✅ corrected function name
-            scene_description=description,
-            thumbnail_urls=[c["thumbnail"] for c in candidates],
+    jobs.add_work("planning")
+    async with limits.plan_slots:
+        scene_plan = await plan_visual_scenes(
             block_text=block_text,
+            total_target_sec=target_sec,
             user_prompt=user_prompt,
+            use_cache=use_llm_cache
         )
+    jobs.advance("planning")
 
-        # If needed, attach the best candidate (by index)
-        selected_video = candidates[best_video] if candidates else {}
+    # Step 2: Search, rerank and download every scene concurrently (order is kept)
+    final_results = await run_scene_pipeline(
+        scene_plan,
+        block_text=block_text,
+        user_prompt=user_prompt,
+        use_llm_cache=use_llm_cache
+    )
 
-        final_results.append({
-            "description": description,
-            "target_sec": duration,
-            "selected_video": selected_video
-        })
+    # Step 3: Stitch and trim selected videos into final clip, unless the
+    # previous render used exactly the same scenes and clips
+    clips = [
+        [r["description"], r["target_sec"], clip_key(r["selected_video"]) if r["selected_video"] else None]
+        for r in final_results
+    ]
+    final_video_path = os.path.join("projects", project_name, "media", "video", f"{block_id}.mp4")
+    previous = build_graph.get_record(project_name, artifact)
+    if (
+        previous
+        and previous.get("clips") == clips
+        and previous.get("output") == await build_graph.fingerprint(final_video_path)
+    ):
+        print(f"✅ {block_id} uses the same scenes and clips, skipping encode")
+        for r in final_results:
+            if r.get("trimmed_path") and os.path.exists(r["trimmed_path"]):
+                os.remove(r["trimmed_path"])
+    else:
+        final_video_path = await stitch_and_trim_scenes(
+            scenes=final_results,
+            project_name=project_name,
+            block_id=block_id
+        )
 
-    # Step 3: Stitch and trim selected videos into final clip
-    final_video_path = await stitch_and_trim_scenes(
-        scenes=final_results,
-        project_name=project_name,
-        block_id=block_id
+    await build_graph.record(
+        project_name, artifact, inputs, final_video_path,
+        user_prompt=user_prompt or "", scene_plan=scene_plan, clips=clips
     )
-
+    events.publish(project_name, "video_ready", block_id=block_id, url=f"/static/{project_name}/media/video/{block_id}.mp4")
     return final_video_path
\ No newline at end of file
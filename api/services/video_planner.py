@@ -1,14 +1,53 @@
-import os
 import json
 import re
-from openai import AsyncOpenAI
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from api.services.http_clients import get_openai_client
+from api.services.resilience import call
+from api.services.llm_cache import llm_cache_key, get_cached, set_cached
 
-async def plan_visual_scenes(block_text: str, total_target_sec: int = 8, user_prompt: str = ""):
+PLANNER_MODEL = "gpt-4o"
+
+
+def fit_to_duration(plan: list, total_target_sec: float) -> list:
+    """
+    Scales the scenes' target_sec so they add up to the narration duration
+    exactly (the model is only asked for tenths of a second).
+    """
+    total = sum(float(scene.get("target_sec") or 0) for scene in plan)
+    if total <= 0:
+        share = total_target_sec / max(len(plan), 1)
+        return [{**scene, "target_sec": round(share, 3)} for scene in plan]
+    scale = total_target_sec / total
+    fitted = [{**scene, "target_sec": round(float(scene.get("target_sec") or 0) * scale, 3)} for scene in plan]
+    fitted[-1]["target_sec"] = round(total_target_sec - sum(s["target_sec"] for s in fitted[:-1]), 3)
+    return fitted
+
+
+def is_valid_plan(plan) -> bool:
+    """
+    A non-empty list of scenes, each a dict with a text description and a
+    numeric (or missing) target_sec.
+    """
+    if not isinstance(plan, list) or not plan:
+        return False
+    for scene in plan:
+        if not isinstance(scene, dict):
+            return False
+        if not isinstance(scene.get("description"), str) or not scene["description"].strip():
+            return False
+        try:
+            float(scene.get("target_sec") or 0)
+        except (TypeError, ValueError):
+            return False
+    return True
+
+
+async def plan_visual_scenes(block_text: str, total_target_sec: float = 8.0, user_prompt: str = "", use_cache: bool = True):
     """
     Given a narration block and optional user guidance, return a list of visual scenes:
     [{ "description": ..., "target_sec": ... }]
+    Scene durations always add up to total_target_sec.
+    Plans are memoized in the LLM cache unless use_cache is False.
     """
 
     user_guidance = f"User Visual Guidance:\n{user_prompt.strip()}\n" if user_prompt.strip() else ""
@@ -20,7 +59,7 @@ Your task is to take a short narration block (used in a voiceover) and divide it
 
 Each scene must include:
 1. A **short, vivid visual description** (what the video should visually depict). This should be optimized to return relevant Pexels videos when used as a search query.
-2. An **integer duration in seconds** under the key `target_sec`. The total across all scenes should **add up exactly** to the total narration duration provided.
+2. A **duration in seconds** (at most one decimal place) under the key `target_sec`. The total across all scenes should **add up exactly** to the total narration duration provided.
 
 Only use realistic visual descriptions — avoid abstract metaphors, emotions, or symbolic phrases. Describe exactly what should appear visually, like “man brushing teeth in mirror,” “alarm clock ringing at 6 AM,” “woman sprinting in park at sunrise,” etc.
 
@@ -29,7 +68,7 @@ Narration Block:
 {block_text.strip()}
 \"\"\"
 
-{user_guidance}Total desired video duration: {total_target_sec} seconds
+{user_guidance}Total desired video duration: {total_target_sec:.1f} seconds
 
 Respond ONLY in this strict JSON format:
 [
@@ -39,8 +78,16 @@ Respond ONLY in this strict JSON format:
 Your output MUST be valid JSON.
 """
 
-    response = await client.chat.completions.create(
-        model="gpt-4o",
+    cache_key = llm_cache_key("scene_plan", PLANNER_MODEL, prompt, temperature=0.7)
+    cached = get_cached(cache_key, use_cache)
+    if is_valid_plan(cached):
+        print("📦 Using cached scene plan")
+        return fit_to_duration(cached, total_target_sec)
+
+    response = await call(
+        "openai",
+        get_openai_client().chat.completions.create,
+        model=PLANNER_MODEL,
         temperature=0.7,
         messages=[{"role": "user", "content": prompt}]
     )
@@ -51,7 +98,11 @@ Your output MUST be valid JSON.
     try:
         # Strip ```json or ``` from beginning and end if present
         cleaned = re.sub(r"^```(?:json)?|```$", "", raw_content.strip(), flags=re.MULTILINE).strip()
-        return json.loads(cleaned)
+        plan = json.loads(cleaned)
+        if not is_valid_plan(plan):
+            raise ValueError(f"unexpected plan shape: {type(plan).__name__}")
+        set_cached(cache_key, plan)
+        return fit_to_duration(plan, total_target_sec)
     except Exception as e:
         print("❌ Failed to parse JSON from LLM:", e)
         return [
@@ -1,21 +1,25 @@
 # api/services/video_reranker.py
 
-import os
-from openai import AsyncOpenAI
 from typing import List
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from api.services.http_clients import get_openai_client
+from api.services.resilience import call
+from api.services.llm_cache import llm_cache_key, get_cached, set_cached
+
+RERANK_MODEL = "gpt-4o"
 
 async def rerank_with_gpt4v(
     scene_description: str,
     thumbnail_urls: List[str],
     block_text: str,
-    user_prompt: str = ""
+    user_prompt: str = "",
+    use_cache: bool = True
 ) -> int:
     """
     Uses GPT-4o to choose the best thumbnail given a scene description,
     the full narration block, and optional user guidance.
     Returns the index (0-based) of the best-matching thumbnail.
+    Decisions are memoized in the LLM cache unless use_cache is False.
     """
 
     system_message = {
@@ -51,8 +55,18 @@ async def rerank_with_gpt4v(
         {"type": "image_url", "image_url": {"url": url}} for url in thumbnail_urls
     ]
 
-    response = await client.chat.completions.create(
-        model="gpt-4o",
+    cache_key = llm_cache_key(
+        "rerank", RERANK_MODEL, [system_message["content"], text_part["text"]],
+        thumbnails=list(thumbnail_urls),
+    )
+    cached = get_cached(cache_key, use_cache)
+    if cached is not None:
+        return cached
+
+    response = await call(
+        "openai",
+        get_openai_client().chat.completions.create,
+        model=RERANK_MODEL,
         messages=[
             system_message,
             {"role": "user", "content": [text_part] + image_parts}
@@ -62,7 +76,9 @@ async def rerank_with_gpt4v(
 
     try:
         content = response.choices[0].message.content.strip()
-        return int(content)
+        best = int(content)
+        set_cached(cache_key, best)
+        return best
     except Exception as e:
         print("❌ Failed to parse GPT-4o response:", e)
         print("Raw content:", response.choices[0].message.content)
@@ -1,97 +1,126 @@
 # api/services/video_stitcher.py
 
 import os
-import json
-from datetime import datetime
+import asyncio
 import subprocess
+from datetime import datetime
+from typing import Tuple
 
 from moviepy.editor import VideoFileClip, concatenate_videoclips
-import httpx
 import tempfile
 
-
-def get_video_json_path(project_name: str):
-    return os.path.join("projects", project_name, "media", "video", "video.json")
+from api.config import CANONICAL_FPS, BLOCK_RENDERER, BLOCK_SCENE_PAD_SEC
+from . import jobs, limits, metadata_store
+from .media_exec import run_in_pool
+from .clip_cache import cached_clip
+from .assembler import CANONICAL_VIDEO_ARGS
+from .block_renderer import render_block
+from .trimmer import trim_clip
 
 
-async def download_and_trim(video_url: str, target_sec: int) -> str:
+async def download_and_trim(video: dict, target_sec: float) -> Tuple[str, float]:
     """
-    Downloads video and trims to target_sec using ffmpeg. Returns path to trimmed temp file.
+    Fetches the selected Pexels video (through the shared clip cache) and trims
+    it to target_sec with a stream copy (no re-encode).
+    Returns (path to trimmed temp file, achieved duration in seconds).
     """
-    async with httpx.AsyncClient() as client:
-        r = await client.get(video_url)
-        r.raise_for_status()
-        tmp_input = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
-        tmp_input.write(r.content)
-        tmp_input.close()
-
     tmp_output = tempfile.NamedTemporaryFile(delete=False, suffix=".mp4")
     tmp_output.close()
 
-    subprocess.run([
-        "ffmpeg", "-y",
-        "-i", tmp_input.name,
-        "-t", str(target_sec),
-        "-c", "copy",
-        tmp_output.name
-    ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        async with cached_clip(video) as source_path:
+            achieved = await trim_clip(source_path, tmp_output.name, target_sec)
+    except BaseException:
+        os.remove(tmp_output.name)
+        raise
 
-    return tmp_output.name
+    return tmp_output.name, achieved
 
 
-async def stitch_and_trim_scenes(scenes, project_name: str, block_id: str) -> str:
+def _render_clips(segments, final_path: str, extra_duration: float = BLOCK_SCENE_PAD_SEC) -> None:
     """
-    Downloads and trims each selected video, then stitches into final video for block.
-    Stores video in /media/video/{block_id}.mp4 and updates video.json metadata.
+    Legacy moviepy renderer: plays each (clip path, target seconds) segment for
+    its target plus `extra_duration` seconds, holding the last frame, and
+    encodes them into one file using the canonical block profile. Runs inside
+    the media process pool; used when the ffmpeg filter graph is unavailable.
     """
-    trimmed_paths = []
+    clips = [VideoFileClip(path) for path, _ in segments]
+    try:
+        padded = [
+            clip.set_duration(float(target) + extra_duration)
+            for clip, (_, target) in zip(clips, segments)
+        ]
+        final = concatenate_videoclips(padded, method="compose")
+        final.write_videofile(
+            final_path,
+            fps=CANONICAL_FPS,
+            codec="libx264",
+            audio=False,
+            ffmpeg_params=CANONICAL_VIDEO_ARGS,
+            logger=None
+        )
+    finally:
+        for clip in clips:
+            clip.close()
+
+
+async def _render(scenes, final_path: str) -> None:
+    if BLOCK_RENDERER == "ffmpeg":
+        segments = [(s["trimmed_path"], s.get("trimmed_sec"), s["target_sec"]) for s in scenes]
+        try:
+            await render_block(segments, final_path)
+            return
+        except (subprocess.CalledProcessError, FileNotFoundError) as e:
+            detail = e.stderr[-500:] if isinstance(e, subprocess.CalledProcessError) else e
+            print(f"⚠️ ffmpeg block render failed, falling back to moviepy: {detail}")
+    await run_in_pool(_render_clips, [(s["trimmed_path"], s["target_sec"]) for s in scenes], final_path)
 
-    for scene in scenes:
-        url = scene["selected_video"]["video_url"]
-        sec = scene["target_sec"]
-        trimmed_path = await download_and_trim(url, sec)
-        trimmed_paths.append(trimmed_path)
 
-    # Load and slightly extend each clip
-    clips = []
-    extra_duration = 0.3  # seconds to extend each clip
-    for path in trimmed_paths:
-        clip = VideoFileClip(path)
-        padded_clip = clip.set_duration(clip.duration + extra_duration)
-        clips.append(padded_clip)
-
-    final = concatenate_videoclips(clips, method="compose")
+async def stitch_and_trim_scenes(scenes, project_name: str, block_id: str) -> str:
+    """
+    Downloads and trims each selected video (unless already downloaded), then stitches into final video for block.
+    Stores video in /media/video/{block_id}.mp4 and updates video.json metadata.
+    """
+    # Scenes coming from the scene pipeline are already downloaded; fetch the rest concurrently
+    pending = [
+        s for s in scenes
+        if not s.get("trimmed_path") and s.get("selected_video", {}).get("video_url")
+    ]
+    async def _fetch(scene):
+        async with limits.download_slots:
+            return await download_and_trim(scene["selected_video"], scene["target_sec"])
+
+    downloaded = await asyncio.gather(*(_fetch(s) for s in pending))
+    for scene, (path, achieved) in zip(pending, downloaded):
+        scene["trimmed_path"] = path
+        scene["trimmed_sec"] = achieved
+
+    usable = [s for s in scenes if s.get("trimmed_path")]
+    trimmed_paths = [s["trimmed_path"] for s in usable]
+    if not trimmed_paths:
+        raise ValueError(f"No usable clips found for {block_id}")
 
     # Create folder if needed
     output_dir = os.path.join("projects", project_name, "media", "video")
     os.makedirs(output_dir, exist_ok=True)
 
     final_path = os.path.join(output_dir, f"{block_id}.mp4")
-    final.write_videofile(final_path, codec="libx264", audio=False, logger=None)
-
-    # Clean up
-    for clip in clips:
-        clip.close()
-    for path in trimmed_paths:
-        os.remove(path)
-
-    # ✅ Update video.json
-    metadata_path = get_video_json_path(project_name)
-    video_url = f"/static/{project_name}/media/video/{block_id}.mp4"
-    now = datetime.utcnow().isoformat()
-
-    if os.path.exists(metadata_path):
-        with open(metadata_path, "r") as f:
-            metadata = json.load(f)
-    else:
-        metadata = {}
-
-    metadata[block_id] = {
-        "updated_at": now,
-        "url": video_url
+    jobs.add_work("encode")
+    try:
+        await _render(usable, final_path)
+    finally:
+        for path in trimmed_paths:
+            os.remove(path)
+    jobs.advance("encode")
+
+    # ✅ Update video.json (locked, batched with concurrent blocks, atomic)
+    entry = {
+        "updated_at": datetime.utcnow().isoformat(),
+        "url": f"/static/{project_name}/media/video/{block_id}.mp4"
     }
-
-    with open(metadata_path, "w") as f:
-        json.dump(metadata, f, indent=2)
+    await metadata_store.update_async(
+        project_name, os.path.join("media", "video", "video.json"),
+        lambda metadata: metadata.__setitem__(block_id, entry)
+    )
 
     return final_path
\ No newline at end of file
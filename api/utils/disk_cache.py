@@ -0,0 +1,83 @@
+# api/utils/disk_cache.py
+import os
+import json
+import time
+import hashlib
+from typing import Any, Optional
+
+from api.utils.fs import atomic_write_json
+
+_EVICT_EVERY = 50  # writes between size checks
+
+
+def hash_key(*parts: Any) -> str:
+    """Stable sha256 over JSON-encoded parts."""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Tiny persistent key/value store: one JSON file per key under `directory`.
+    Entries record when they were stored and, optionally, when they expire.
+    With `max_entries` set, the oldest entries are evicted once the store grows past it.
+    """
+
+    def __init__(self, directory: str, max_entries: Optional[int] = None):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._writes = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[dict]:
+        """Returns {"value": ..., "stored_at": epoch seconds, ...} or None if missing/expired."""
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return entry
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        entry = {"value": value, "stored_at": now}
+        if ttl is not None:
+            entry["expires_at"] = now + ttl
+        atomic_write_json(self._path(key), entry)
+
+        self._writes += 1
+        if self.max_entries and self._writes % _EVICT_EVERY == 0:
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def evict(self) -> int:
+        """Drops the oldest entries beyond `max_entries`. Returns how many were removed."""
+        if not self.max_entries or not os.path.isdir(self.directory):
+            return 0
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".json")]
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return 0
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:excess]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+        return excess
+
+    def count(self) -> int:
+        if not os.path.isdir(self.directory):
+            return 0
+        return sum(1 for e in os.scandir(self.directory) if e.name.endswith(".json"))
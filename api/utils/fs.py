@@ -1,5 +1,5 @@
 # api/utils/fs.py
-import os, json, re
+import os, json, re, tempfile
 from datetime import datetime, timezone
 
 _SLUG_RE = re.compile(r"[^a-z0-9_-]+")
@@ -14,9 +14,15 @@ def now_iso() -> str:
 
 def atomic_write_json(path: str, data: dict) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    tmp = f"{path}.part"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-        f.flush()
-        os.fsync(f.fileno())
-    os.replace(tmp, path)
+    # Unique temp name so concurrent writers never share a half-written file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
@@ -3,11 +3,13 @@ import json
 from typing import List
 from openai import OpenAI
 from api.schemas.projects import BlockOut
+from api.services.resilience import call_sync
 from dotenv import load_dotenv
 
 load_dotenv()
 
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Retries are handled by the resilience layer, not the SDK
+client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
 
 SYSTEM_PROMPT = """
 You are a script structuring assistant for 9:16 vertical short videos.
@@ -51,7 +53,9 @@ def generate_blocks_from_idea(script_idea: str) -> List[BlockOut]:
     user_prompt = f"Script Idea:\n{script_idea}\n\nFormat as a JSON object with a 'blocks' key."
 
     try:
-        response = client.chat.completions.create(
+        response = call_sync(
+            "openai",
+            client.chat.completions.create,
             model="gpt-4",  # or "gpt-3.5-turbo"
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT.strip()},